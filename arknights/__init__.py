@@ -1,4 +1,17 @@
 # encoding: utf-8
-from arknights.operator import Operator, get_operators_data
-from arknights.resource import Resource, get_resources_data
-__all__ = [operator, resource]
+# Submodules are imported on first attribute access, keeping `import arknights` cheap
+__all__ = ['Operator', 'get_operators_data', 'Resource', 'get_resources_data']
+
+_EXPORTS = {
+    'Operator': 'arknights.operator',
+    'get_operators_data': 'arknights.operator',
+    'Resource': 'arknights.resource',
+    'get_resources_data': 'arknights.resource',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,235 @@
+# encoding: utf-8
+"""Reports of many accounts in one run, ``arknights-calc batch needed total --accounts rosters/``.
+
+The game data is compiled once and written to a directory of ``.npy`` files, which every worker
+process memory-maps read-only: the workers share one copy of the cost tables through the page cache
+instead of each one loading the catalog. Accounts are fanned out over the workers, each one gets its
+reports in its own directory, and the totals of all accounts plus a summary line per account are
+written next to them.
+"""
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from arknights import cli, explmd, reports, roster, writers
+from arknights import crafting as workshop
+from arknights import engine as cost_engine
+from arknights.resource import get_resources_data
+
+DEFAULT_ROSTER_NAME = 'user_operators'  # Rosters named like this are named after their directory
+SUMMARY_FILE_NAME = 'accounts'
+
+
+@dataclass(frozen=True)
+class Account:
+    name: str
+    path: str
+
+
+@dataclass(frozen=True)
+class GameData:
+    """Everything the workers need of the game data, memory-mapped from a ``share`` directory."""
+    engine: cost_engine.CostEngine
+    table: explmd.ExpLmdTable
+    crafting: workshop.Crafting
+    df_resources: pd.DataFrame
+
+    @classmethod
+    def share(cls, directory) -> Path:
+        """Compile the game data once and write it to ``directory``."""
+        directory = Path(directory)
+        cost_engine.get_engine().save(directory / 'engine')
+        explmd.get_table().save(directory / 'explmd')
+        workshop.get_crafting().save(directory / 'crafting')
+        df_resources = reports.resources_frame(get_resources_data())
+        (directory / 'resources.pkl').write_bytes(pickle.dumps(df_resources, protocol=pickle.HIGHEST_PROTOCOL))
+        return directory
+
+    @classmethod
+    def open(cls, directory) -> 'GameData':
+        directory = Path(directory)
+        return cls(engine=cost_engine.CostEngine.load(directory / 'engine'),
+                   table=explmd.ExpLmdTable.load_saved(directory / 'explmd'),
+                   crafting=workshop.Crafting.load(directory / 'crafting'),
+                   df_resources=pickle.loads((directory / 'resources.pkl').read_bytes()))
+
+
+@dataclass(frozen=True)
+class AccountResult:
+    account: Account
+    summary: dict = field(default_factory=dict)
+    totals: Optional[pd.DataFrame] = None  # reports.total_resource of the account
+    error: Optional[str] = None
+    row_errors: List[roster.RowError] = field(default_factory=list)  # Invalid rows, left out of the reports
+
+
+# Game data of the current worker process, set by init_worker
+_game_data: Optional[GameData] = None
+
+
+def init_worker(directory: str):
+    global _game_data
+    _game_data = GameData.open(directory)
+
+
+def account_name(path: Path) -> str:
+    return path.parent.name if path.stem == DEFAULT_ROSTER_NAME and path.parent.name else path.stem
+
+
+def find_accounts(source: str, exclude: Optional[str] = None) -> List[Account]:
+    """Rosters of a directory (every ``*.csv`` under it but those under ``exclude``) or of a manifest file
+    (one roster path per line, relative to the manifest, blank lines and ``#`` comments skipped)."""
+    source = Path(source)
+    if source.is_dir():
+        excluded = Path(exclude).resolve() if exclude else None
+        paths = sorted(path for path in source.rglob('*.csv')
+                       if excluded is None or excluded not in path.resolve().parents)
+    else:
+        lines = (line.strip() for line in source.read_text(encoding='utf-8').splitlines())
+        paths = [source.parent / line for line in lines if line and not line.startswith('#')]
+    accounts, seen = [], dict()
+    for path in paths:
+        name = account_name(path)
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:  # Several rosters with the same name get numbered directories
+            name = f'{name}-{seen[name]}'
+        accounts.append(Account(name=name, path=str(path)))
+    return accounts
+
+
+def info_sums(info: pd.DataFrame) -> dict:
+    """Sums of the roster frame info the account summary is made of, added up over the chunks of a roster."""
+    return {
+        'operators': len(info),
+        'overall_percentage': float(info['overall_percentage'].sum()),
+        'needed_material_quantity': int(info['needed_material_quantity'].sum()),
+    }
+
+
+def account_summary(sums: List[dict], totals: pd.DataFrame) -> dict:
+    operators = sum(part['operators'] for part in sums)
+    overall = sum(part['overall_percentage'] for part in sums)
+    needed = totals['Needed']
+    return {
+        'operators': operators,
+        'overall_percentage': round(overall / operators, 2) if operators else 100.0,
+        'needed_material_quantity': sum(part['needed_material_quantity'] for part in sums),
+        'needed_lmd': int(needed.get('LMD', 0)),
+        'needed_yellow_exp': int(needed.get(reports.YELLOW_EXP, 0)),
+    }
+
+
+def stream_account(path: str) -> Tuple[pd.DataFrame, List[dict], List[roster.RowError]]:
+    """Totals, summary sums and invalid rows of a roster read chunk by chunk, in bounded memory."""
+    sums, errors = [], []
+
+    def chunks():
+        for chunk in roster.iter_roster(path, engine=_game_data.engine, table=_game_data.table):
+            errors.extend(chunk.errors)
+            yield chunk
+
+    totals = reports.stream_total_resource(chunks(), _game_data.df_resources, engine=_game_data.engine,
+                                           table=_game_data.table,
+                                           on_frame=lambda frame: sums.append(info_sums(frame.info)))
+    return totals, sums, errors
+
+
+def run_account(account: Account, names, output_dir: str, file_format: str) -> AccountResult:
+    """Write the reports of one account, in a worker process set up by ``init_worker``.
+
+    When only ``cli.STREAMED_REPORTS`` are asked for, the roster is read chunk by chunk in bounded memory,
+    otherwise it is loaded whole, the per-operator reports needing every row.
+    """
+    data = cli.ReportData(operators_path=account.path, events_path=None)
+    # Seeds the cached properties, nothing is loaded from the catalog
+    data.df_resources, data.crafting = _game_data.df_resources, _game_data.crafting
+    try:
+        if set(names) <= cli.STREAMED_REPORTS:
+            totals, sums, errors = stream_account(account.path)
+        else:
+            loaded = roster.read_roster(account.path, engine=_game_data.engine, table=_game_data.table)
+            data.frame = roster.build_frame(loaded.roster, engine=_game_data.engine, table=_game_data.table)
+            totals = reports.total_resource(data.frame, _game_data.df_resources)
+            sums, errors = [info_sums(data.frame.info)], loaded.errors
+        data.totals = totals
+        cli.run_reports(names, data, output_dir=f'{output_dir}/{account.name}', file_format=file_format,
+                        verbose=False)
+    except Exception as error:  # One account, unreadable roster or failing report, must not end the batch
+        return AccountResult(account=account, error=f'{type(error).__name__}: {error}')
+    return AccountResult(account=account, summary=account_summary(sums, totals), totals=totals, row_errors=errors)
+
+
+def summary_table(results: List[AccountResult]) -> pd.DataFrame:
+    rows = [dict(account=result.account.name, **result.summary, invalid_rows=len(result.row_errors),
+                 error=result.error or '') for result in results]
+    table = pd.DataFrame(rows).set_index('account')
+    counts = ['operators', 'needed_material_quantity', 'needed_lmd', 'needed_yellow_exp', 'invalid_rows']
+    # Skipped accounts count 0, their percentage is left blank
+    return table.fillna({column: 0 for column in counts if column in table}).astype(
+        {column: 'int64' for column in counts if column in table})
+
+
+def report_account(result: AccountResult):
+    if result.error:
+        print(f"{result.account.name}: skipped, {result.error}")
+    else:
+        print(f"{result.account.name}: {result.summary['operators']} operators, "
+              f"{result.summary['overall_percentage']}% done")
+    for error in result.row_errors[:roster.MAX_REPORTED_ERRORS]:
+        print(f"    skipped {error}")
+    if len(result.row_errors) > roster.MAX_REPORTED_ERRORS:
+        print(f"    skipped {len(result.row_errors) - roster.MAX_REPORTED_ERRORS} more invalid rows")
+
+
+def write_aggregates(results: List[AccountResult], output_dir: str, file_format: str):
+    """Totals of all accounts together and one summary line per account."""
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    extension, format_writer = writers.FORMATS[file_format]
+    file_name, _, write = cli.REPORTS['total']
+    tables = [result.totals for result in results if result.totals is not None]
+    if tables:
+        totals_path = f'{output_dir}/{cli.today()}-{file_name}{extension}'
+        (format_writer or write)(reports.combine_totals(tables), totals_path)
+        print(f"Totals of {len(tables)} accounts saved at {totals_path}")
+    summary_path = f'{output_dir}/{cli.today()}-{SUMMARY_FILE_NAME}{extension}'
+    summary_writer = format_writer or partial(writers.save_as_xlsx_table, table_name='Accounts')
+    summary_writer(summary_table(results), summary_path)
+    print(f"Account summary saved at {summary_path}")
+
+
+def run_batch(source: str, names, output_dir: str = cli.DEFAULT_REPORTS_PATH, jobs: int = 0,
+              file_format: str = 'xlsx') -> List[AccountResult]:
+    """Write the reports of every account of ``source``, ``jobs`` accounts at a time, then the aggregates."""
+    global _game_data
+    accounts = find_accounts(source, exclude=output_dir)  # CSV reports of earlier runs are no rosters
+    if not accounts:
+        print(f"No rosters found in {source}")
+        return []
+    names = list(dict.fromkeys(names))
+    jobs = min(jobs or os.cpu_count() or 1, len(accounts))
+    run = partial(run_account, names=names, output_dir=output_dir, file_format=file_format)
+    results = []
+    with tempfile.TemporaryDirectory(prefix='arknights-batch-') as shared:
+        GameData.share(shared)
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(shared,)) as executor:
+                for result in executor.map(run, accounts):
+                    report_account(result)
+                    results.append(result)
+        else:
+            init_worker(shared)
+            try:
+                for result in map(run, accounts):
+                    report_account(result)
+                    results.append(result)
+            finally:
+                _game_data = None  # Releases the memory maps before the directory is removed
+    write_aggregates(results, output_dir, file_format)
+    return results
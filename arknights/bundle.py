@@ -0,0 +1,131 @@
+# encoding: utf-8
+"""Single-file game data bundle.
+
+All operator and resource JSON files plus the ``explmd/*star.csv`` tables are compiled into one
+msgpack file of ``schema.GameData``, loaded and validated with a single read. Build it after every
+scraping run with:
+
+    python -m arknights.bundle build
+"""
+import argparse
+import hashlib
+import struct
+import warnings
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import msgspec
+
+from arknights import constants, schema
+
+BUNDLE_MAGIC = b'AKGD'
+BUNDLE_VERSION = 3  # 1 was a pickle of the raw JSON data, 2 had no source digest
+HEADER = struct.Struct('<4sH32s')  # magic, version, source_digest
+
+bundle_decoder = msgspec.msgpack.Decoder(schema.GameData)
+
+
+def read_operators_json() -> Dict[str, schema.Operator]:
+    data = dict()
+    for path in Path(constants.Paths.OPERATORS_PATH.value).resolve().glob('*/*.json'):
+        operator = schema.read_operator(path)
+        data[operator.name] = operator
+    return data
+
+
+def read_resources_json() -> Dict[str, schema.ResourceData]:
+    data = dict()
+    for path in Path(constants.Paths.RESOURCES_PATH.value).resolve().glob('*/*.json'):
+        resource = schema.read_resource(path)
+        data[resource.name] = resource
+    return data
+
+
+def read_exp_lmd_csv() -> dict:
+    return {stars: constants.load_exp_lmd_data(f'resources/explmd/{stars}star.csv') for stars in range(1, 6 + 1)}
+
+
+def source_files() -> List[Path]:
+    """Every data file a bundle is compiled from, in a stable order."""
+    sources = [Path(constants.Paths.OPERATORS_PATH.value).resolve().glob('*/*.json'),
+               Path(constants.Paths.RESOURCES_PATH.value).resolve().glob('*/*.json'),
+               (constants.PACKAGE_PATH / 'resources/explmd').glob('*star.csv')]
+    return sorted(path for paths in sources for path in paths)
+
+
+def source_digest(paths: List[Path]) -> bytes:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def compile_bundle() -> schema.GameData:
+    return schema.GameData(operators=read_operators_json(), resources=read_resources_json(),
+                           explmd=read_exp_lmd_csv())
+
+
+def build(path: str = constants.Paths.BUNDLE_PATH.value) -> Path:
+    """Compile the source data files into a bundle at ``path``."""
+    payload = msgspec.msgpack.encode(compile_bundle())
+    path = Path(path)
+    path.write_bytes(HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, source_digest(source_files())) + payload)
+    return path
+
+
+def load(path: str = constants.Paths.BUNDLE_PATH.value) -> Optional[schema.GameData]:
+    """Read a bundle, returning None when it is missing, unreadable, built by another bundle version or
+    older than the source data files, the callers then read the source files instead."""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    rebuild = "Rebuild it with 'python -m arknights.bundle build'."
+    raw = path.read_bytes()
+    if len(raw) < HEADER.size:
+        warnings.warn(f"Ignoring {path}: truncated bundle. {rebuild}")
+        return None
+    magic, version, digest = HEADER.unpack_from(raw)
+    if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+        warnings.warn(f"Ignoring {path}: expected bundle version {BUNDLE_VERSION}, found {version}. {rebuild}")
+        return None
+    sources = source_files()
+    if sources and digest != source_digest(sources):  # Without the source files, the bundle is all there is
+        warnings.warn(f"Ignoring {path}: the source data files changed since it was built. {rebuild}")
+        return None
+    try:
+        return bundle_decoder.decode(raw[HEADER.size:])
+    except msgspec.DecodeError as error:  # ValidationError included
+        warnings.warn(f"Ignoring {path}: unreadable bundle ({error}). {rebuild}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_bundle() -> Optional[schema.GameData]:
+    """Process-wide bundle, read once. Treat the returned data as read-only."""
+    return load()
+
+
+@lru_cache(maxsize=None)
+def data_version() -> str:
+    """Digest of the game data in use: the bundle when present, or else every source data file."""
+    if get_bundle() is not None:
+        return hashlib.sha256(Path(constants.Paths.BUNDLE_PATH.value).read_bytes()).hexdigest()
+    return source_digest(source_files()).hex()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m arknights.bundle', description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='Compile the game data into a bundle.')
+    build_parser.add_argument('-o', '--output', default=constants.Paths.BUNDLE_PATH.value)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        path = build(args.output)
+        print(f"Bundle saved at {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# encoding: utf-8
+"""Persistent per-row roster results.
+
+Each roster row is keyed by a hash of its operator and state columns. The info metrics and ledger
+entries computed for it are stored on disk together with the game data version, so the next run
+only evaluates rows that changed since, and rebuilds the whole RosterFrame from the stored results.
+A different game data version discards the stored results.
+"""
+import os
+import pickle
+import struct
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from arknights import bundle
+from arknights import engine as cost_engine
+from arknights import roster as user_roster
+
+DEFAULT_CACHE_PATH = 'files/cache/roster.cache'
+CACHE_MAGIC = b'AKRC'
+CACHE_VERSION = 1
+HEADER = struct.Struct('<4sH')  # magic, version
+KEY_COLUMNS = ['name'] + list(user_roster.ROSTER_DEFAULTS)
+
+
+def row_keys(roster: pd.DataFrame) -> np.ndarray:
+    """uint64 hash of the operator and state of every roster row."""
+    return pd.util.hash_pandas_object(roster[KEY_COLUMNS], index=False).to_numpy()
+
+
+def take_rows(frame: user_roster.RosterFrame, rows: np.ndarray) -> user_roster.RosterFrame:
+    """Frame of the given rows, in the given order and renumbered from 0."""
+    ledger_rows = frame.ledger['row'].to_numpy()  # Ledger entries are grouped by row, in row order
+    offsets = np.searchsorted(ledger_rows, np.arange(len(frame.info) + 1))
+    owners, entries = cost_engine.gather(offsets, rows)
+    ledger = frame.ledger.iloc[entries].reset_index(drop=True)
+    ledger['row'] = owners
+    return user_roster.RosterFrame(info=frame.info.iloc[rows].reset_index(drop=True), ledger=ledger)
+
+
+def concat(first: user_roster.RosterFrame, second: user_roster.RosterFrame) -> user_roster.RosterFrame:
+    """Rows of ``first`` followed by those of ``second``."""
+    ledger = second.ledger.copy()
+    ledger['row'] += len(first.info)
+    return user_roster.RosterFrame(info=pd.concat([first.info, second.info], ignore_index=True),
+                                   ledger=pd.concat([first.ledger, ledger], ignore_index=True))
+
+
+@dataclass(frozen=True)
+class RosterCache:
+    """Stored results: one frame row per distinct key."""
+    data_version: str
+    keys: np.ndarray  # (row,) uint64
+    frame: user_roster.RosterFrame
+
+    def save(self, path: str = DEFAULT_CACHE_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        temporary = path.with_suffix(path.suffix + '.tmp')
+        temporary.write_bytes(HEADER.pack(CACHE_MAGIC, CACHE_VERSION) + payload)
+        os.replace(temporary, path)  # Readers never see a partially written cache
+
+
+def load(path: str = DEFAULT_CACHE_PATH) -> Optional[RosterCache]:
+    """Stored results, None when missing, unreadable or computed from other game data."""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    raw = path.read_bytes()
+    magic, version = HEADER.unpack_from(raw) if len(raw) >= HEADER.size else (None, None)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        warnings.warn(f"Ignoring {path}: not a roster cache of version {CACHE_VERSION}.")
+        return None
+    try:
+        stored = pickle.loads(raw[HEADER.size:])
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError) as error:
+        # Truncated file, or results pickled by an older layout of the classes
+        warnings.warn(f"Ignoring {path}: unreadable roster cache ({type(error).__name__}: {error}).")
+        return None
+    if not isinstance(stored, RosterCache):
+        warnings.warn(f"Ignoring {path}: not a roster cache of version {CACHE_VERSION}.")
+        return None
+    return stored if stored.data_version == bundle.data_version() else None
+
+
+def update(stored: Optional[RosterCache], roster: pd.DataFrame) -> Tuple[user_roster.RosterFrame, RosterCache]:
+    """``roster.build_frame`` evaluating only rows missing from ``stored``.
+
+    Returns the frame and the results to keep, which are ``stored`` itself when nothing changed.
+    """
+    keys = row_keys(roster)
+    if stored is None:
+        stored = RosterCache(data_version=bundle.data_version(), keys=np.zeros(0, dtype=np.uint64),
+                             frame=user_roster.build_frame(roster.iloc[:0]))
+
+    # Position of each row in the stored results, rows not found are evaluated and appended to them
+    positions = pd.Index(stored.keys).get_indexer(keys)
+    missing = np.flatnonzero(positions < 0)
+    if len(missing):
+        unique_missing = np.unique(keys[missing], return_index=True)[1]
+        new_rows = missing[unique_missing]
+        pool = concat(stored.frame, user_roster.build_frame(roster.iloc[new_rows].reset_index(drop=True)))
+        pool_keys = np.concatenate([stored.keys, keys[new_rows]])
+        positions = pd.Index(pool_keys).get_indexer(keys)
+    else:
+        pool, pool_keys = stored.frame, stored.keys
+
+    frame = take_rows(pool, positions)
+    # Only the current roster's rows are kept, one per key
+    current = np.unique(positions)
+    if len(missing) or len(current) != len(pool_keys):
+        stored = RosterCache(data_version=stored.data_version, keys=pool_keys[current], frame=take_rows(pool, current))
+    return frame, stored
+
+
+def build_frame(roster: pd.DataFrame, path: str = DEFAULT_CACHE_PATH) -> user_roster.RosterFrame:
+    """``roster.build_frame`` evaluating only rows missing from the cache at ``path``, which is then updated."""
+    stored = load(path)
+    frame, kept = update(stored, roster)
+    if kept is not stored:
+        kept.save(path)
+    return frame
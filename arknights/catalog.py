@@ -0,0 +1,93 @@
+# encoding: utf-8
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Mapping, Tuple
+
+from arknights import bundle, schema
+
+if TYPE_CHECKING:
+    from arknights.registry import CostVector
+
+
+def read_game_data() -> schema.GameData:
+    """Validated game data, from the compiled bundle when present or else from the JSON files."""
+    game_data = bundle.get_bundle()
+    if game_data is not None:
+        return game_data
+    return schema.GameData(operators=bundle.read_operators_json(), resources=bundle.read_resources_json())
+
+
+@dataclass(frozen=True, slots=True)
+class OperatorData:
+    """Static game data of one operator, one instance per name shared by every Operator of that name."""
+    name: str
+    stars: int
+    elite: Tuple[schema.Upgrade, ...]  # Promotions
+    skill_upgrades: Tuple[schema.Upgrade, ...]  # Skill levels
+    masteries: Tuple[schema.Mastery, ...]  # Mastery levels, per skill
+    _totals: Dict[str, 'CostVector'] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_schema(cls, operator: schema.Operator) -> 'OperatorData':
+        return cls(name=operator.name, stars=operator.stars, elite=operator.elite,
+                   skill_upgrades=operator.skills.upgrade, masteries=operator.skills.mastery)
+
+    def total_costs(self, track: str = None) -> 'CostVector':
+        """Read-only resources of every 'elite', 'skill' or 'mastery' upgrade (all of them without a track),
+        computed once per operator."""
+        if track not in self._totals:
+            from arknights import registry  # numpy is only imported once a cost is computed
+            vector = registry.get_registry().vector()
+            levels = []
+            if track is None:
+                for each in ('skill', 'elite', 'mastery'):
+                    vector += self.total_costs(each)
+            elif track == 'elite':
+                levels = self.elite
+            elif track == 'skill':
+                levels = self.skill_upgrades
+            elif self.stars > 3:  # Operators up to 3 stars cannot be mastered
+                levels = [level for mastery in self.masteries for level in mastery.upgrade]
+            for level in levels:
+                vector.add_entries(level.resources)
+            self._totals[track] = vector.freeze()
+        return self._totals[track]
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Name-keyed, read-only index of the operator and resource game data."""
+    operators: Mapping[str, schema.Operator]
+    resources: Mapping[str, schema.ResourceData]
+    _operator_data: Dict[str, OperatorData] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @classmethod
+    def load(cls) -> 'Catalog':
+        game_data = read_game_data()
+        return cls(operators=MappingProxyType(game_data.operators), resources=MappingProxyType(game_data.resources))
+
+    def operator(self, name: str) -> schema.Operator:
+        try:
+            return self.operators[name]
+        except KeyError:
+            raise KeyError(f"Unknown operator: {name!r}") from None
+
+    def operator_data(self, name: str) -> OperatorData:
+        """Shared OperatorData of an operator, built on first use."""
+        data = self._operator_data.get(name)
+        if data is None:
+            data = self._operator_data[name] = OperatorData.from_schema(self.operator(name))
+        return data
+
+    def resource(self, name: str) -> schema.ResourceData:
+        try:
+            return self.resources[name]
+        except KeyError:
+            raise KeyError(f"Unknown resource: {name!r}") from None
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> Catalog:
+    """Process-wide catalog, built on first use."""
+    return Catalog.load()
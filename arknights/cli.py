@@ -0,0 +1,340 @@
+# encoding: utf-8
+"""Command line entry point: ``arknights-calc report needed spent total``, ``arknights-calc watch ...``
+to regenerate reports whenever their input files change, ``arknights-calc batch ...`` for many accounts,
+or ``arknights-calc serve`` to answer cost queries over HTTP."""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, date
+from functools import cached_property, partial
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from arknights import cache, planner, reports, roster, service, watch, writers
+from arknights import crafting as workshop
+from arknights import inventory as user_inventory
+from arknights.resource import get_resources_data
+
+DEFAULT_OPERATORS_PATH = 'files/user_operators.csv'
+DEFAULT_INVENTORY_PATH = 'files/user_resources.csv'
+DEFAULT_EVENTS_PATH = 'files/event_resources.csv'
+DEFAULT_TARGETS_PATH = 'files/user_targets.csv'
+DEFAULT_REPORTS_PATH = 'files/reports'
+BACKSLASH = '\\'
+
+
+def today() -> date:
+    return datetime.now(pytz.timezone('America/Sao_Paulo')).date()
+
+
+class ReportData:
+    """Data shared by the reports of a run, each piece loaded only when a report asks for it."""
+
+    def __init__(self, operators_path: str = DEFAULT_OPERATORS_PATH, cache_path: Optional[str] = None,
+                 inventory_path: str = DEFAULT_INVENTORY_PATH, events_path: Optional[str] = DEFAULT_EVENTS_PATH,
+                 targets_path: Optional[str] = DEFAULT_TARGETS_PATH):
+        self.operators_path = operators_path
+        self.cache_path = cache_path  # Roster results cache, only changed rows are evaluated when set
+        self.inventory_path = inventory_path
+        self.events_path = events_path
+        self.targets_path = targets_path  # Sidecar targets of the plan report, used when the file exists
+        self.row_cache: Optional[cache.RosterCache] = None  # Cached roster results, kept across reloads
+        self.written = dict()  # Report path -> table last written there
+
+    @property
+    def inputs(self) -> dict:
+        """Input file path -> name of the data loaded from it."""
+        paths = {self.operators_path: 'operators', self.inventory_path: 'inventory'}
+        if self.events_path:
+            paths[self.events_path] = 'inventory'
+        if self.targets_path:
+            paths[self.targets_path] = 'targets'
+        return paths
+
+    def invalidate(self, *names: str):
+        """Drop loaded data ('operators', 'inventory' or 'targets'), to be reloaded from its files when asked for
+        again."""
+        attributes = {'operators': ('user_roster', 'frame', 'totals'), 'inventory': ('inventory',), 'targets': ('targets',)}
+        for name in names:
+            for attribute in attributes[name]:
+                self.__dict__.pop(attribute, None)
+
+    @cached_property
+    def user_roster(self) -> pd.DataFrame:
+        """Valid rows of the operators csv, target columns included."""
+        loaded = roster.read_roster(self.operators_path)
+        roster.warn_errors(self.operators_path, loaded.errors)
+        return loaded.roster
+
+    @cached_property
+    def frame(self):
+        user_roster = self.user_roster
+        if self.cache_path is None:
+            return roster.build_frame(user_roster)
+        if self.row_cache is None:
+            self.row_cache = cache.load(self.cache_path)
+        frame, kept = cache.update(self.row_cache, user_roster)
+        if kept is not self.row_cache:
+            kept.save(self.cache_path)
+            self.row_cache = kept
+        return frame
+
+    @cached_property
+    def totals(self) -> pd.DataFrame:
+        """``reports.total_resource`` of the roster. Unless another report loaded the whole roster already,
+        it is read and aggregated chunk by chunk, in memory bounded whatever the roster size."""
+        if 'frame' in self.__dict__ or 'user_roster' in self.__dict__:
+            return reports.total_resource(self.frame, self.df_resources)
+        errors = []
+
+        def chunks():
+            for chunk in roster.iter_roster(self.operators_path):
+                errors.extend(chunk.errors)
+                yield chunk
+
+        totals = reports.stream_total_resource(chunks(), self.df_resources)
+        roster.warn_errors(self.operators_path, errors)
+        return totals
+
+    @cached_property
+    def targets(self) -> Optional[pd.DataFrame]:
+        """Sidecar targets, None without a targets file."""
+        if self.targets_path and Path(self.targets_path).is_file():
+            return planner.load_targets(self.targets_path)
+        return None
+
+    @cached_property
+    def df_resources(self) -> pd.DataFrame:
+        return reports.resources_frame(get_resources_data())
+
+    @cached_property
+    def crafting(self) -> workshop.Crafting:
+        return workshop.get_crafting()
+
+    @cached_property
+    def inventory(self) -> np.ndarray:
+        """Resources held plus the rewards of the events not done yet, aligned with the crafting resources."""
+        resources = self.crafting.resources
+        held = user_inventory.load_inventory(self.inventory_path, resources)
+        if self.events_path and Path(self.events_path).is_file():
+            held += user_inventory.load_event_resources(self.events_path, resources)
+        return held
+
+
+def needed_table(data: ReportData) -> pd.DataFrame:
+    return reports.needed_resource(data.frame)
+
+
+def spent_table(data: ReportData) -> pd.DataFrame:
+    return reports.spent_resource(data.frame)
+
+
+def total_table(data: ReportData) -> pd.DataFrame:
+    return data.totals
+
+
+def resources_table(data: ReportData) -> pd.DataFrame:
+    return reports.resources(data.frame, data.df_resources)
+
+
+def resources_by_operator_table(data: ReportData) -> pd.DataFrame:
+    return reports.resources_by_operator(data.frame)
+
+
+def shortage_table(data: ReportData) -> pd.DataFrame:
+    return reports.shortage(data.frame, data.inventory, data.crafting)
+
+
+def crafting_table(data: ReportData) -> pd.DataFrame:
+    return reports.crafting_needs(data.frame, data.crafting)
+
+
+def farming_table(data: ReportData) -> pd.DataFrame:
+    return reports.farming(data.frame, data.inventory, data.crafting)
+
+
+def plan_table(data: ReportData) -> pd.DataFrame:
+    user_roster = planner.with_targets(data.user_roster, data.targets)
+    if data.targets is not None:  # Targets of the roster csv were checked as it was read, the sidecar's are not
+        checked = roster.validate_targets(user_roster)
+        roster.warn_errors(f'{data.operators_path} with the targets of {data.targets_path}', checked.errors)
+        user_roster = checked.roster
+    return reports.plan_resources(user_roster, planner.plan(user_roster))
+
+
+# Report name -> (file name, table builder, xlsx writer). Writers run in worker processes, so they
+# must be picklable module level functions.
+REPORTS = {
+    'needed': ('operator_needed_resource', needed_table,
+               partial(writers.save_as_xlsx_table, table_name='NeededResources')),
+    'spent': ('operator_spent_resource', spent_table,
+              partial(writers.save_as_xlsx_table, table_name='SpentResources')),
+    'total': ('total_resources', total_table,
+              partial(writers.save_as_xlsx_table, table_name='TotalResources')),
+    'resources': ('resources-report', resources_table, writers.save_as_xlsx),
+    'by-operator': ('resources-by-operator', resources_by_operator_table, writers.save_as_excel),
+    'shortage': ('shortage', shortage_table, partial(writers.save_as_xlsx_table, table_name='Shortage')),
+    'crafting': ('crafting', crafting_table, partial(writers.save_as_xlsx_table, table_name='Crafting')),
+    'farming': ('farming', farming_table, partial(writers.save_as_xlsx_table, table_name='Farming')),
+    'plan': ('plan', plan_table, partial(writers.save_as_xlsx_table, table_name='Plan')),
+}
+# Report name -> data it is built from
+REPORT_INPUTS = {name: {'operators'} for name in REPORTS}
+REPORT_INPUTS['shortage'] = REPORT_INPUTS['farming'] = {'operators', 'inventory'}
+REPORT_INPUTS['plan'] = {'operators', 'targets'}
+# Reports built from the roster alone, the ones batch runs write for every account
+ROSTER_REPORTS = [name for name in REPORTS if REPORT_INPUTS[name] == {'operators'}]
+# Reports aggregated chunk by chunk (ReportData.totals), in bounded memory when asked for without the others
+STREAMED_REPORTS = {'total'}
+
+
+def run_reports(names, data: ReportData, output_dir: str = DEFAULT_REPORTS_PATH, jobs: int = 1,
+                file_format: str = 'xlsx', verbose: bool = True):
+    """Build each report table from the shared data, then write the files, ``jobs`` at a time."""
+    log = print if verbose else lambda message: None
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    names = list(dict.fromkeys(names))  # Each report once, in the requested order
+    jobs = min(jobs or os.cpu_count() or 1, len(names))
+    extension, format_writer = writers.FORMATS[file_format]
+    with ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext() as executor:
+        pending = []
+        for name in names:
+            file_name, build, write = REPORTS[name]
+            write = format_writer or write
+            report_path = f'{output_dir}/{today()}-{file_name}{extension}'
+            log(f"Generating {name} report")
+            table = build(data)
+            previous = data.written.get(report_path)
+            if previous is not None and previous.equals(table):
+                log(f"Report unchanged at {report_path.replace(BACKSLASH, '/')}")
+                continue
+            data.written[report_path] = table
+            if executor is None:
+                write(table, report_path)
+                log(f"Report saved at {report_path.replace(BACKSLASH, '/')}")
+            else:
+                pending.append((executor.submit(write, table, report_path), report_path))
+        for future, report_path in pending:
+            future.result()
+            log(f"Report saved at {report_path.replace(BACKSLASH, '/')}")
+
+
+def watch_reports(names, data: ReportData, output_dir: str = DEFAULT_REPORTS_PATH, file_format: str = 'xlsx',
+                  interval: float = watch.DEFAULT_INTERVAL, debounce: float = watch.DEFAULT_DEBOUNCE):
+    """Generate the reports, then keep the data in memory and regenerate the reports built from changed files."""
+    names = list(dict.fromkeys(names))
+    run_reports(names, data, output_dir=output_dir, file_format=file_format)
+    needed = set().union(*(REPORT_INPUTS[name] for name in names))
+    inputs = {path: name for path, name in data.inputs.items() if name in needed}
+
+    def regenerate(paths):
+        changed = {inputs[path] for path in paths}
+        print(f"Changed: {', '.join(sorted(paths))}")
+        started = time.perf_counter()
+        data.invalidate(*changed)
+        try:
+            run_reports([name for name in names if REPORT_INPUTS[name] & changed], data, output_dir=output_dir,
+                        file_format=file_format)
+        except (OSError, KeyError, ValueError) as error:  # A bad save must not end the watch, the next one may fix it
+            print(f"Reports not regenerated: {error}")
+            return
+        print(f"Done in {time.perf_counter() - started:.2f}s")
+
+    print(f"Watching {', '.join(inputs)}. Press Ctrl+C to stop.")
+    try:
+        watch.watch(inputs, regenerate, interval=interval, debounce=debounce)
+    except KeyboardInterrupt:
+        pass
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='arknights-calc', description='Arknights resources calculator.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    # Options shared by the report and watch commands
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('reports', nargs='+', choices=list(REPORTS), metavar='report',
+                        help=f"One or more of: {', '.join(REPORTS)}.")
+    common.add_argument('--operators', default=DEFAULT_OPERATORS_PATH,
+                        help=f'User operators csv (default: {DEFAULT_OPERATORS_PATH}).')
+    common.add_argument('--inventory', default=DEFAULT_INVENTORY_PATH,
+                        help=f'User resources csv, for the shortage report (default: {DEFAULT_INVENTORY_PATH}).')
+    common.add_argument('--events', default=DEFAULT_EVENTS_PATH,
+                        help=f'Event rewards csv, rewards of events not done yet count as held '
+                             f'(default: {DEFAULT_EVENTS_PATH}).')
+    common.add_argument('--targets', default=DEFAULT_TARGETS_PATH,
+                        help=f'Target states csv for the plan report, replacing the target_* columns of the '
+                             f'operators csv when it exists (default: {DEFAULT_TARGETS_PATH}).')
+    common.add_argument('-o', '--output-dir', default=DEFAULT_REPORTS_PATH,
+                        help=f'Directory the reports are written to (default: {DEFAULT_REPORTS_PATH}).')
+    common.add_argument('--cache', default=cache.DEFAULT_CACHE_PATH,
+                        help=f'Roster results cache, rows unchanged since the last run are not evaluated '
+                             f'again (default: {cache.DEFAULT_CACHE_PATH}).')
+    common.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='Evaluate every roster row and leave the cache untouched.')
+    common.add_argument('-f', '--format', default='xlsx', choices=list(writers.FORMATS),
+                        help='Output format; xlsx-stream writes workbooks in constant memory, parquet and '
+                             'arrow need pyarrow (default: xlsx).')
+
+    report_parser = subparsers.add_parser('report', parents=[common], help='Generate reports.')
+    report_parser.add_argument('-j', '--jobs', type=int, default=1,
+                               help='Worker processes writing the reports, 0 for one per CPU (default: 1).')
+
+    watch_parser = subparsers.add_parser('watch', parents=[common],
+                                         help='Generate reports, then regenerate them when their input files change.')
+    watch_parser.add_argument('--interval', type=float, default=watch.DEFAULT_INTERVAL,
+                              help=f'Seconds between checks of the input files (default: {watch.DEFAULT_INTERVAL}).')
+    watch_parser.add_argument('--debounce', type=float, default=watch.DEFAULT_DEBOUNCE,
+                              help=f'Seconds a changed file must stay unchanged before the reports are regenerated '
+                                   f'(default: {watch.DEFAULT_DEBOUNCE}).')
+
+    batch_parser = subparsers.add_parser('batch', help='Generate the reports of many accounts, plus their totals.')
+    batch_parser.add_argument('reports', nargs='+', choices=ROSTER_REPORTS, metavar='report',
+                              help=f"One or more of: {', '.join(ROSTER_REPORTS)}.")
+    batch_parser.add_argument('--accounts', required=True,
+                              help='Directory of roster csv files (searched recursively), or a manifest file '
+                                   'listing one roster path per line.')
+    batch_parser.add_argument('-o', '--output-dir', default=DEFAULT_REPORTS_PATH,
+                              help=f'Directory the reports are written to, one subdirectory per account '
+                                   f'(default: {DEFAULT_REPORTS_PATH}).')
+    batch_parser.add_argument('-j', '--jobs', type=int, default=0,
+                              help='Worker processes, each one evaluating an account at a time, 0 for one per CPU '
+                                   '(default: 0).')
+    batch_parser.add_argument('-f', '--format', default='xlsx', choices=list(writers.FORMATS),
+                              help='Output format (default: xlsx).')
+
+    serve_parser = subparsers.add_parser('serve', help='Answer cost queries over HTTP, keeping the game data loaded.')
+    serve_parser.add_argument('--host', default=service.DEFAULT_HOST,
+                              help=f'Address to listen on (default: {service.DEFAULT_HOST}).')
+    serve_parser.add_argument('--port', type=int, default=service.DEFAULT_PORT,
+                              help=f'Port to listen on (default: {service.DEFAULT_PORT}).')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'batch':
+        from arknights import batch  # Imports this module
+        batch.run_batch(args.accounts, args.reports, output_dir=args.output_dir, jobs=args.jobs,
+                        file_format=args.format)
+        return
+    if args.command == 'serve':
+        service.serve(host=args.host, port=args.port)
+        return
+    data = ReportData(operators_path=args.operators, cache_path=args.cache, inventory_path=args.inventory,
+                      events_path=args.events, targets_path=args.targets)
+    if args.command == 'report':
+        run_reports(args.reports, data, output_dir=args.output_dir, jobs=args.jobs, file_format=args.format)
+    elif args.command == 'watch':
+        watch_reports(args.reports, data, output_dir=args.output_dir, file_format=args.format,
+                      interval=args.interval, debounce=args.debounce)
+
+
+if __name__ == "__main__":
+    main()
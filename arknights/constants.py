@@ -1,12 +1,14 @@
 # encoding: utf-8
 import csv
 from enum import Enum
+from functools import lru_cache
+from pathlib import Path
 
-import pkg_resources
+PACKAGE_PATH = Path(__file__).resolve().parent
 
 
 def load_exp_lmd_data(file):
-    with open(pkg_resources.resource_filename(__name__, file), mode="r", encoding="utf-8") as f:
+    with open(PACKAGE_PATH / file, mode="r", encoding="utf-8") as f:
         data = [dict(user_operator) for user_operator in csv.DictReader(f, delimiter=';')]
 
     for level in data:
@@ -26,7 +28,26 @@ def load_exp_lmd_data(file):
     return new_data
 
 
+@lru_cache(maxsize=None)
+def get_exp_data(stars: int) -> dict:
+    """EXP/LMD table of a rarity, read on first use from the bundle or its explmd csv."""
+    from arknights import bundle  # bundle depends on this module
+    game_data = bundle.get_bundle()
+    if game_data is not None:
+        return game_data.explmd[stars]
+    return load_exp_lmd_data(f'resources/explmd/{stars}star.csv')
+
+
+@lru_cache(maxsize=None)
+def get_max_level(stars: int) -> tuple:
+    """(elite key, level) of a fully leveled operator of that rarity."""
+    exp_data = get_exp_data(stars)
+    max_elite = max(exp_data, key=lambda elite: int(elite.replace('elite_', '')))
+    return max_elite, max(exp_data[max_elite])
+
+
 class Paths(Enum):
-    RESOURCES_PATH: str = pkg_resources.resource_filename(__name__, "resources/resource/")
-    OPERATORS_PATH: str = pkg_resources.resource_filename(__name__, "resources/operator/")
-    EXP_DATA: dict = {i: load_exp_lmd_data(f'resources/explmd/{i}star.csv') for i in range(1, 6 + 1)}
+    RESOURCES_PATH: str = str(PACKAGE_PATH / "resources/resource")
+    OPERATORS_PATH: str = str(PACKAGE_PATH / "resources/operator")
+    BUNDLE_PATH: str = str(PACKAGE_PATH / "resources/bundle.bin")
+    STAGES_PATH: str = str(PACKAGE_PATH / "resources/stages.csv")
@@ -0,0 +1,117 @@
+# encoding: utf-8
+"""Workshop crafting: decomposition of resources into their ingredients.
+
+The recipe graph is compiled once into a closure matrix in topological order, so expanding any
+resource vector (or a matrix of them) into ingredients and workshop LMD is a single product.
+"""
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from arknights import catalog
+from arknights import registry
+
+CRAFTING_ARRAYS = ('tiers', 'recipes', 'lmd_cost')
+
+
+def topological_order(recipes: np.ndarray) -> np.ndarray:
+    """Resource indices with every ingredient before the resources crafted from it."""
+    pending = np.count_nonzero(recipes, axis=1)  # Ingredients not yet ordered, per product
+    ready = list(np.flatnonzero(pending == 0))
+    order = []
+    while ready:
+        ingredient = ready.pop()
+        order.append(ingredient)
+        for product in np.flatnonzero(recipes[:, ingredient]):
+            pending[product] -= 1
+            if pending[product] == 0:
+                ready.append(product)
+    if len(order) != len(recipes):
+        raise ValueError("Recipe graph has a cycle")
+    return np.array(order, dtype=np.intp)
+
+
+@dataclass(frozen=True)
+class Crafting:
+    resources: Tuple[str, ...]
+    tiers: np.ndarray  # (resource,)
+    recipes: np.ndarray  # (product, ingredient), ingredient quantity per craft
+    lmd_cost: np.ndarray  # (resource,), workshop LMD per craft
+    order: np.ndarray = field(init=False)
+    _closures: Dict[int, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, init=False, repr=False,
+                                                                compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'order', topological_order(self.recipes))
+
+    @classmethod
+    def compile(cls, game_catalog: catalog.Catalog) -> 'Crafting':
+        resource_registry = registry.ResourceRegistry.from_catalog(game_catalog)
+        resources, index = resource_registry.names, resource_registry.ids
+        tiers = np.zeros(len(resources), dtype=np.int64)
+        recipes = np.zeros((len(resources), len(resources)), dtype=np.int64)
+        lmd_cost = np.zeros(len(resources), dtype=np.int64)
+        for name, data in game_catalog.resources.items():
+            product = index[name]
+            tiers[product] = data.tier
+            lmd_cost[product] = data.lmd
+            for ingredient in data.recipe:
+                recipes[product, index[ingredient.name]] += ingredient.quantity
+        return cls(resources=resources, tiers=tiers, recipes=recipes, lmd_cost=lmd_cost)
+
+    def save(self, directory) -> Path:
+        """Write the compiled arrays as ``.npy`` files, to be memory-mapped back by ``load``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / 'resources.json').write_text(json.dumps(list(self.resources)), encoding='utf-8')
+        for name in CRAFTING_ARRAYS:
+            np.save(directory / f'{name}.npy', getattr(self, name))
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode: Optional[str] = 'r') -> 'Crafting':
+        """Crafting tables written by ``save``, without the game catalog."""
+        directory = Path(directory)
+        resources = tuple(json.loads((directory / 'resources.json').read_text(encoding='utf-8')))
+        return cls(resources=resources, **{name: np.load(directory / f'{name}.npy', mmap_mode=mmap_mode)
+                                           for name in CRAFTING_ARRAYS})
+
+    @property
+    def craftable(self) -> np.ndarray:
+        return self.recipes.any(axis=1)
+
+    def closure(self, min_tier: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(resource, resource) decomposition matrix and per-unit workshop LMD.
+
+        Every craftable resource of tier ``min_tier`` or above is decomposed, recursively, into
+        ingredients; row ``i`` of the matrix is what one unit of resource ``i`` breaks down to.
+        """
+        if min_tier not in self._closures:
+            decompose = self.craftable & (self.tiers >= min_tier)
+            matrix = np.eye(len(self.resources), dtype=np.int64)
+            lmd = np.zeros(len(self.resources), dtype=np.int64)
+            for product in self.order:  # Ingredient rows are final before any product using them
+                if decompose[product]:
+                    matrix[product] = self.recipes[product] @ matrix
+                    lmd[product] = self.lmd_cost[product] + self.recipes[product] @ lmd
+            self._closures[min_tier] = matrix, lmd
+        return self._closures[min_tier]
+
+    def expand(self, quantities: np.ndarray, min_tier: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Decompose a resource vector, or a (row, resource) matrix, into ingredients and workshop LMD.
+
+        With the default ``min_tier`` everything is broken down to base materials; ``min_tier=5``
+        only decomposes tier 5 resources into their tier 4 ingredients.
+        """
+        matrix, lmd = self.closure(min_tier)
+        return quantities @ matrix, quantities @ lmd
+
+
+@lru_cache(maxsize=None)
+def get_crafting() -> Crafting:
+    """Process-wide crafting tables compiled from the game catalog."""
+    return Crafting.compile(catalog.get_catalog())
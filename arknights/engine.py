@@ -0,0 +1,272 @@
+# encoding: utf-8
+"""Vectorized roster cost engine.
+
+Every operator's upgrade steps are compiled into a dense ``(operator, step, resource)`` array, so
+total/spent/needed resources of a whole roster are computed with a few array operations instead
+of one ``Operator`` at a time. Results match the ``Operator`` properties.
+"""
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from arknights import catalog
+from arknights import registry
+
+# Step axis layout: 2 elite promotions, 7 skill levels and 3 mastery levels for up to 5 skills
+ELITE_LEVELS = 2
+SKILL_LEVELS = 7
+MASTERY_SKILLS = 5
+MASTERY_LEVELS = 3
+TRACKS: Dict[str, slice] = {
+    'elite': slice(0, ELITE_LEVELS),
+    'skill': slice(ELITE_LEVELS, ELITE_LEVELS + SKILL_LEVELS),
+    'mastery': slice(ELITE_LEVELS + SKILL_LEVELS, ELITE_LEVELS + SKILL_LEVELS + MASTERY_SKILLS * MASTERY_LEVELS),
+}
+STEPS = TRACKS['mastery'].stop
+
+# Roster columns holding the state of each track, and the highest reachable value of each
+STATE_COLUMNS = ('elite', 'skill_level', 's1_mastery', 's2_mastery', 's3_mastery', 's4_mastery', 's5_mastery')
+MAX_STATE = np.array([ELITE_LEVELS, SKILL_LEVELS] + [MASTERY_LEVELS] * MASTERY_SKILLS)
+
+# Per step: track (index into TRACKS), STATE_COLUMNS column it depends on, level it reaches and mastered skill
+STEP_TRACK = np.repeat(np.arange(len(TRACKS), dtype=np.int8),
+                       [ELITE_LEVELS, SKILL_LEVELS, MASTERY_SKILLS * MASTERY_LEVELS])
+STEP_STATE = np.repeat(np.arange(len(STATE_COLUMNS), dtype=np.int8),
+                       [ELITE_LEVELS, SKILL_LEVELS] + [MASTERY_LEVELS] * MASTERY_SKILLS)
+STEP_LEVEL = np.concatenate([np.arange(1, ELITE_LEVELS + 1), np.arange(1, SKILL_LEVELS + 1)]
+                            + [np.arange(1, MASTERY_LEVELS + 1)] * MASTERY_SKILLS).astype(np.int8)
+STEP_SKILL = np.maximum(STEP_STATE - 1, 0).astype(np.int8)
+
+# Arrays of a compiled engine, as written by CostEngine.save
+ENGINE_ARRAYS = ('stars', 'steps', 'elite_table', 'skill_table', 'mastery_table',
+                 'entry_offsets', 'entry_step', 'entry_resource', 'entry_quantity')
+
+
+def prefix_sums(steps: np.ndarray) -> np.ndarray:
+    """Cumulative cost along the level axis (-2) with a leading zero level: ``table[..., n, :]`` is levels 1..n."""
+    shape = steps.shape[:-2] + (steps.shape[-2] + 1, steps.shape[-1])
+    table = np.zeros(shape, dtype=np.int64)
+    np.cumsum(steps, axis=-2, out=table[..., 1:, :])
+    return table
+
+
+def code_dtype(categories: int) -> np.dtype:
+    """Smallest signed integer type holding the codes of ``categories`` categories."""
+    return np.result_type(np.min_scalar_type(-categories), np.int8)
+
+
+def gather(offsets: np.ndarray, groups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Entries of ``groups`` from CSR-style ``offsets`` (group g is ``offsets[g]:offsets[g + 1]``).
+
+    Returns, per gathered entry, its position in ``groups`` and its entry index, in ``groups`` order.
+    """
+    counts = offsets[groups + 1] - offsets[groups]
+    owners = np.repeat(np.arange(len(groups), dtype=np.int32 if len(groups) < 2 ** 31 else np.int64), counts)
+    entries = np.repeat(offsets[groups] - (np.cumsum(counts) - counts), counts)
+    entries += np.arange(len(entries))
+    return owners, entries
+
+
+@dataclass(frozen=True)
+class RosterCosts:
+    """Per roster row resource quantities, one column per entry of ``resources``."""
+    resources: Tuple[str, ...]
+    track_total: Dict[str, np.ndarray]
+    track_spent: Dict[str, np.ndarray]
+    total: np.ndarray = field(init=False)
+    spent: np.ndarray = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'total', sum(self.track_total.values()))
+        object.__setattr__(self, 'spent', sum(self.track_spent.values()))
+
+    @property
+    def needed(self) -> np.ndarray:
+        return np.clip(self.total - self.spent, 0, None)
+
+    def track_needed(self, track: str) -> np.ndarray:
+        return np.clip(self.track_total[track] - self.track_spent[track], 0, None)
+
+    def to_dicts(self, quantities: np.ndarray) -> List[Dict[str, int]]:
+        """Rows as ``{resource: quantity}`` dicts without zero entries, like the Operator properties."""
+        return [{self.resources[i]: int(row[i]) for i in np.flatnonzero(row)} for row in quantities]
+
+
+@dataclass(frozen=True)
+class CostEngine:
+    operators: Tuple[str, ...]
+    stars: np.ndarray  # (operator,)
+    resources: Tuple[str, ...]
+    steps: np.ndarray  # (operator, step, resource)
+    # Cumulative cost tables, "cost to reach level n" of each track is a single lookup
+    elite_table: np.ndarray = field(init=False, repr=False)  # (operator, elite 0..2, resource)
+    skill_table: np.ndarray = field(init=False, repr=False)  # (operator, skill level 0..7, resource)
+    mastery_table: np.ndarray = field(init=False, repr=False)  # (operator, skill, mastery 0..3, resource)
+    # Non-zero step costs as (step, resource, quantity) entries grouped by operator, rows of operator o
+    # are entry_offsets[o]:entry_offsets[o + 1]. Masteries of operators up to 3 stars are left out.
+    entry_offsets: np.ndarray = field(init=False, repr=False)  # (operator + 1,)
+    entry_step: np.ndarray = field(init=False, repr=False)  # (entry,)
+    entry_resource: np.ndarray = field(init=False, repr=False)  # (entry,)
+    entry_quantity: np.ndarray = field(init=False, repr=False)  # (entry,)
+
+    def __post_init__(self):
+        operators, resources = self.steps.shape[0], self.steps.shape[2]
+        object.__setattr__(self, 'elite_table', prefix_sums(self.steps[:, TRACKS['elite']]))
+        object.__setattr__(self, 'skill_table', prefix_sums(self.steps[:, TRACKS['skill']]))
+        mastery_steps = self.steps[:, TRACKS['mastery']].reshape(operators, MASTERY_SKILLS, MASTERY_LEVELS, resources)
+        object.__setattr__(self, 'mastery_table', prefix_sums(mastery_steps))
+
+        steps = self.steps.copy()
+        steps[self.stars <= 3, TRACKS['mastery']] = 0
+        entry_operator, entry_step, entry_resource = np.nonzero(steps)
+        offsets = np.zeros(operators + 1, dtype=np.intp)
+        np.cumsum(np.bincount(entry_operator, minlength=operators), out=offsets[1:])
+        object.__setattr__(self, 'entry_offsets', offsets)
+        # Compact dtypes, ledgers of large rosters are gathered from these
+        object.__setattr__(self, 'entry_step', entry_step.astype(np.int8))
+        object.__setattr__(self, 'entry_resource', entry_resource.astype(code_dtype(resources)))
+        object.__setattr__(self, 'entry_quantity', steps[entry_operator, entry_step, entry_resource].astype(np.int32))
+
+    @classmethod
+    def compile(cls, game_catalog: catalog.Catalog) -> 'CostEngine':
+        operators = tuple(sorted(game_catalog.operators))
+        resource_registry = registry.ResourceRegistry.from_catalog(game_catalog)
+        resources, resource_index = resource_registry.names, resource_registry.ids
+        stars = np.zeros(len(operators), dtype=np.int8)
+        steps = np.zeros((len(operators), STEPS, len(resources)), dtype=np.int64)
+
+        def fill(op, step, level_resources):
+            for resource in level_resources:
+                steps[op, step, resource_index[resource.name]] += resource.quantity
+
+        for op, name in enumerate(operators):
+            data = game_catalog.operator(name)
+            stars[op] = data.stars
+            for elite in data.elite:
+                fill(op, TRACKS['elite'].start + elite.level - 1, elite.resources)
+            for level in data.skills.upgrade:
+                fill(op, TRACKS['skill'].start + level.level - 1, level.resources)
+            for mastery in data.skills.mastery:
+                first_step = TRACKS['mastery'].start + (mastery.skill - 1) * MASTERY_LEVELS
+                for level in mastery.upgrade:
+                    fill(op, first_step + level.level - 1, level.resources)
+        return cls(operators=operators, stars=stars, resources=resources, steps=steps)
+
+    def save(self, directory) -> Path:
+        """Write the compiled arrays as ``.npy`` files, to be memory-mapped back by ``load``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        names = {'operators': list(self.operators), 'resources': list(self.resources)}
+        (directory / 'names.json').write_text(json.dumps(names), encoding='utf-8')
+        for name in ENGINE_ARRAYS:
+            np.save(directory / f'{name}.npy', getattr(self, name))
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode: Optional[str] = 'r') -> 'CostEngine':
+        """Engine written by ``save``, nothing is compiled again.
+
+        Arrays are memory-mapped read-only by default: every process loading the same directory reads
+        one copy of them from the page cache.
+        """
+        directory = Path(directory)
+        names = json.loads((directory / 'names.json').read_text(encoding='utf-8'))
+        engine = cls.__new__(cls)
+        object.__setattr__(engine, 'operators', tuple(names['operators']))
+        object.__setattr__(engine, 'resources', tuple(names['resources']))
+        for name in ENGINE_ARRAYS:
+            object.__setattr__(engine, name, np.load(directory / f'{name}.npy', mmap_mode=mmap_mode))
+        return engine
+
+    @property
+    def operator_index(self) -> Dict[str, int]:
+        return {name: i for i, name in enumerate(self.operators)}
+
+    def indices(self, names) -> np.ndarray:
+        index = self.operator_index
+        try:
+            return np.array([index[name] for name in names], dtype=np.intp)
+        except KeyError as error:
+            raise KeyError(f"Unknown operator: {error.args[0]!r}") from None
+
+    @staticmethod
+    def state_matrix(roster: Mapping) -> np.ndarray:
+        """(row, STATE_COLUMNS) int array from a roster DataFrame or mapping of columns; missing columns are 0."""
+        rows = len(roster['name'])
+        return np.column_stack([
+            np.asarray(roster[column], dtype=np.int64) if column in roster else np.zeros(rows, dtype=np.int64)
+            for column in STATE_COLUMNS
+        ])
+
+    def max_states(self, operators: np.ndarray) -> np.ndarray:
+        """Fully upgraded state of each operator. Operators up to 3 stars cannot be mastered."""
+        states = np.tile(MAX_STATE, (len(operators), 1))
+        states[self.stars[operators] <= 3, 2:] = 0
+        return states
+
+    def cost_to(self, operators: np.ndarray, states: np.ndarray, track: str = None) -> np.ndarray:
+        """Resources spent to bring each operator from a fresh state (E0, no skills) to ``states``."""
+        states = np.clip(states, 0, MAX_STATE)
+        if track == 'elite':
+            return self.elite_table[operators, states[:, 0]]
+        if track == 'skill':
+            return self.skill_table[operators, states[:, 1]]
+        if track == 'mastery':
+            skills = np.arange(MASTERY_SKILLS)
+            return self.mastery_table[operators[:, None], skills, states[:, 2:]].sum(axis=1)
+        return sum(self.cost_to(operators, states, track) for track in TRACKS)
+
+    def cost_between(self, operators: np.ndarray, from_states: np.ndarray, to_states: np.ndarray,
+                     track: str = None) -> np.ndarray:
+        """Resources needed to go from ``from_states`` to ``to_states``, negative where a state is undone."""
+        return self.cost_to(operators, to_states, track) - self.cost_to(operators, from_states, track)
+
+    def evaluate(self, roster: Mapping) -> RosterCosts:
+        """Total/spent resources for every row of a roster with ``name`` and STATE_COLUMNS columns."""
+        return self.evaluate_states(self.indices(roster['name']), self.state_matrix(roster))
+
+    def evaluate_states(self, operators: np.ndarray, states: np.ndarray) -> RosterCosts:
+        max_states = self.max_states(operators)
+        return RosterCosts(
+            resources=self.resources,
+            track_total={track: self.cost_to(operators, max_states, track) for track in TRACKS},
+            track_spent={track: self.cost_to(operators, states, track) for track in TRACKS}
+        )
+
+    def ledger(self, operators: np.ndarray, states: np.ndarray) -> pd.DataFrame:
+        """Long-format costs: one row per (roster row, upgrade step, resource) with a non-zero quantity.
+
+        Columns are ``row`` (position in the roster), ``operator``, ``track``, ``skill`` (mastered skill,
+        0 outside masteries), ``level`` (level the step reaches), ``resource``, ``quantity`` and ``spent``
+        (whether ``states`` already reached the step). Summing the ledger gives ``evaluate_states``.
+        """
+        rows, entries = gather(self.entry_offsets, operators)
+        steps = self.entry_step[entries]
+        resources = self.entry_resource[entries]
+        quantities = self.entry_quantity[entries]
+        del entries
+        # Small integer types all along, temporaries of large rosters stay a few bytes per entry
+        states = np.clip(states, -1, np.iinfo(np.int8).max).astype(np.int8)
+        levels = STEP_LEVEL[steps]
+        return pd.DataFrame({
+            'row': rows,
+            'operator': pd.Categorical.from_codes(operators.astype(code_dtype(len(self.operators)))[rows],
+                                                  categories=self.operators),
+            'track': pd.Categorical.from_codes(STEP_TRACK[steps], categories=list(TRACKS)),
+            'skill': STEP_SKILL[steps],
+            'level': levels,
+            'resource': pd.Categorical.from_codes(resources, categories=self.resources),
+            'quantity': quantities,
+            'spent': states[rows, STEP_STATE[steps]] >= levels,
+        })
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> CostEngine:
+    """Process-wide engine compiled from the game catalog."""
+    return CostEngine.compile(catalog.get_catalog())
@@ -0,0 +1,103 @@
+# encoding: utf-8
+"""Array-backed EXP/LMD level tables.
+
+Accumulated EXP and LMD per rarity are kept in ``(stars, elite, level)`` arrays, so leveling costs
+of whole arrays of operators are computed with a couple of gathers.
+"""
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from arknights import constants
+
+MAX_STARS = 6
+MAX_ELITE = 2
+MAX_LEVEL = 90
+EXP_PER_YELLOW_RECORD = 1000  # Tactical Battle Record - Yellow Exp
+
+
+@dataclass(frozen=True)
+class ExpLmdTable:
+    accumulated_exp: np.ndarray  # (stars 0..6, elite 0..2, level 0..90)
+    accumulated_lmd: np.ndarray  # (stars 0..6, elite 0..2, level 0..90)
+    level_cap: np.ndarray  # (stars 0..6, elite 0..2), 0 where the rarity cannot reach the elite
+    elite_cap: np.ndarray  # (stars 0..6,)
+
+    @classmethod
+    def load(cls) -> 'ExpLmdTable':
+        shape = (MAX_STARS + 1, MAX_ELITE + 1, MAX_LEVEL + 1)
+        accumulated_exp = np.zeros(shape, dtype=np.int64)
+        accumulated_lmd = np.zeros(shape, dtype=np.int64)
+        level_cap = np.zeros(shape[:2], dtype=np.int64)
+        for stars in range(1, MAX_STARS + 1):
+            for elite_key, levels in constants.get_exp_data(stars).items():
+                elite = int(elite_key.replace('elite_', ''))
+                for level, data in levels.items():
+                    accumulated_exp[stars, elite, level] = data['accumulated exp']
+                    accumulated_lmd[stars, elite, level] = data['accumulated lmd']
+                level_cap[stars, elite] = max(levels)
+        elite_cap = np.array([np.flatnonzero(caps).max(initial=0) for caps in level_cap])
+        return cls(accumulated_exp=accumulated_exp, accumulated_lmd=accumulated_lmd,
+                   level_cap=level_cap, elite_cap=elite_cap)
+
+    def save(self, directory) -> Path:
+        """Write the tables as ``.npy`` files, to be memory-mapped back by ``load_saved``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for table in fields(self):
+            np.save(directory / f'{table.name}.npy', getattr(self, table.name))
+        return directory
+
+    @classmethod
+    def load_saved(cls, directory, mmap_mode: Optional[str] = 'r') -> 'ExpLmdTable':
+        directory = Path(directory)
+        return cls(**{table.name: np.load(directory / f'{table.name}.npy', mmap_mode=mmap_mode)
+                      for table in fields(cls)})
+
+    def clip(self, stars, elite, level):
+        """Clamp (elite, level) pairs into what each rarity can actually reach."""
+        stars = np.asarray(stars)
+        elite = np.clip(elite, 0, self.elite_cap[stars])
+        level = np.clip(level, 1, self.level_cap[stars, elite])
+        return stars, elite, level
+
+    def max_state(self, stars):
+        """(elite, level) of fully leveled operators."""
+        stars = np.asarray(stars)
+        elite = self.elite_cap[stars]
+        return elite, self.level_cap[stars, elite]
+
+    def lmd_at(self, stars, elite, level) -> np.ndarray:
+        """LMD spent leveling up to (elite, level), promotion costs excluded."""
+        return self.accumulated_lmd[self.clip(stars, elite, level)]
+
+    def exp_at(self, stars, elite, level) -> np.ndarray:
+        return self.accumulated_exp[self.clip(stars, elite, level)]
+
+    def yellow_exp_at(self, stars, elite, level) -> np.ndarray:
+        """EXP up to (elite, level) in whole Tactical Battle Records, as the Operator properties count it."""
+        return self.exp_at(stars, elite, level) // EXP_PER_YELLOW_RECORD
+
+    def lmd_between(self, stars, from_elite, from_level, to_elite, to_level) -> np.ndarray:
+        return self.lmd_at(stars, to_elite, to_level) - self.lmd_at(stars, from_elite, from_level)
+
+    def exp_between(self, stars, from_elite, from_level, to_elite, to_level) -> np.ndarray:
+        return self.exp_at(stars, to_elite, to_level) - self.exp_at(stars, from_elite, from_level)
+
+    def yellow_exp_between(self, stars, from_elite, from_level, to_elite, to_level) -> np.ndarray:
+        return self.yellow_exp_at(stars, to_elite, to_level) - self.yellow_exp_at(stars, from_elite, from_level)
+
+    def total_lmd(self, stars) -> np.ndarray:
+        return self.lmd_at(stars, *self.max_state(stars))
+
+    def total_yellow_exp(self, stars) -> np.ndarray:
+        return self.yellow_exp_at(stars, *self.max_state(stars))
+
+
+@lru_cache(maxsize=None)
+def get_table() -> ExpLmdTable:
+    """Process-wide EXP/LMD table."""
+    return ExpLmdTable.load()
@@ -0,0 +1,124 @@
+# encoding: utf-8
+"""Sanity-minimal farming plan.
+
+Solves a linear program over the local stage drop table (``resources/stages.csv``, generated by
+``scrapper/stage_scrapper.py``) for the stage runs, and workshop crafts, that cover what is needed
+at the least sanity. LMD is left out: workshop LMD is reported next to the plan.
+"""
+import csv
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from arknights import constants
+from arknights import crafting as workshop
+from arknights import inventory as user_inventory
+
+
+@dataclass(frozen=True)
+class StageTable:
+    stages: Tuple[str, ...]
+    sanity: np.ndarray  # (stage,)
+    drops: sparse.csr_matrix  # (stage, resource), expected quantity per run
+
+
+def load_stages(resources: Sequence[str], csv_path: str = constants.Paths.STAGES_PATH.value) -> StageTable:
+    """Read a ``stage;sanity;resource;drop_rate`` table, keeping the drops of known resources."""
+    resource_index = {name: i for i, name in enumerate(resources)}
+    stage_index, sanity, rows, columns, rates = dict(), list(), list(), list(), list()
+    with open(csv_path, mode="r", encoding="utf-8") as f:
+        for row in csv.DictReader(f, delimiter=';'):
+            resource = user_inventory.RESOURCE_ALIASES.get(row['resource'], row['resource'])
+            if resource not in resource_index:
+                continue
+            if row['stage'] not in stage_index:
+                stage_index[row['stage']] = len(stage_index)
+                sanity.append(int(row['sanity']))
+            rows.append(stage_index[row['stage']])
+            columns.append(resource_index[resource])
+            rates.append(float(row['drop_rate']))
+    if not stage_index:
+        warnings.warn(f"No stage drops in {csv_path}, farming plans only cover what is held. "
+                      f"Fill it with scrapper/stage_scrapper.py.")
+    drops = sparse.csr_matrix((rates, (rows, columns)), shape=(len(stage_index), len(resources)))
+    return StageTable(stages=tuple(stage_index), sanity=np.array(sanity, dtype=np.float64), drops=drops)
+
+
+@dataclass(frozen=True)
+class FarmingPlan:
+    resources: Tuple[str, ...]
+    stages: Tuple[str, ...]
+    runs: np.ndarray  # (stage,), fractional LP solution
+    crafts: np.ndarray  # (resource,)
+    sanity: float
+    lmd: float  # Workshop LMD of the crafts
+    uncovered: np.ndarray  # (resource,), needed but neither held, dropped nor craftable
+
+    def stage_runs(self) -> dict:
+        """Runs per stage, rounded up to whole runs."""
+        return {self.stages[i]: int(np.ceil(self.runs[i] - 1e-9)) for i in np.flatnonzero(self.runs > 1e-9)}
+
+    def resource_crafts(self) -> dict:
+        return {self.resources[i]: int(np.ceil(self.crafts[i] - 1e-9)) for i in np.flatnonzero(self.crafts > 1e-9)}
+
+
+def obtainable(stage_table: StageTable, crafting: workshop.Crafting) -> np.ndarray:
+    """Resources that drop somewhere, or can be crafted from obtainable ingredients only."""
+    result = np.asarray(stage_table.drops.sum(axis=0)).ravel() > 0
+    for product in crafting.order:  # Ingredients are settled before their products
+        ingredients = crafting.recipes[product] > 0
+        if ingredients.any() and result[ingredients].all():
+            result[product] = True
+    return result
+
+
+def optimize(needed: np.ndarray, inventory: Optional[np.ndarray] = None, stage_table: Optional[StageTable] = None,
+             crafting: Optional[workshop.Crafting] = None) -> FarmingPlan:
+    """Sanity-minimal stage runs and crafts so that drops + inventory + crafts cover ``needed``.
+
+    For every resource r: drops[:, r] @ runs + crafts[r] - recipes[:, r] @ crafts + inventory[r] >= needed[r].
+    Resources that cannot be obtained are only required up to what the inventory holds, the rest is
+    reported as ``uncovered``.
+    """
+    crafting = crafting or workshop.get_crafting()
+    stage_table = stage_table or get_stages()
+    resources = crafting.resources
+    inventory = np.zeros(len(resources)) if inventory is None else np.asarray(inventory, dtype=np.float64)
+    needed = np.asarray(needed, dtype=np.float64)
+
+    available = obtainable(stage_table, crafting)
+    available[resources.index('LMD')] = False
+    required = np.where(available, needed, np.minimum(needed, inventory))
+    uncovered = needed - required
+    uncovered[resources.index('LMD')] = 0
+
+    # Craft variables only for obtainable products, LMD rows dropped
+    craft_columns = np.flatnonzero(crafting.craftable & available)
+    rows = np.array([i for i in range(len(resources)) if resources[i] != 'LMD'])
+    crafted = sparse.csr_matrix(sparse.identity(len(resources), format='csr')[:, craft_columns]
+                                - sparse.csr_matrix(crafting.recipes.T)[:, craft_columns])
+    supply = sparse.hstack([stage_table.drops.T, crafted], format='csr')[rows]
+    costs = np.concatenate([stage_table.sanity, np.zeros(len(craft_columns))])
+    solution, sanity = np.zeros(len(costs)), 0.0
+    if len(costs):
+        result = linprog(costs, A_ub=-supply, b_ub=(inventory - required)[rows], bounds=(0, None), method='highs')
+        if result.status != 0:
+            raise ValueError(f"Farming plan could not be solved: {result.message}")
+        solution, sanity = result.x, float(result.fun)
+
+    runs = solution[:len(stage_table.stages)]
+    crafts = np.zeros(len(resources))
+    crafts[craft_columns] = solution[len(stage_table.stages):]
+    return FarmingPlan(resources=resources, stages=stage_table.stages, runs=runs, crafts=crafts,
+                       sanity=sanity, lmd=float(crafts @ crafting.lmd_cost), uncovered=uncovered)
+
+
+@lru_cache(maxsize=None)
+def get_stages() -> StageTable:
+    """Process-wide stage table aligned with the crafting resources."""
+    return load_stages(workshop.get_crafting().resources)
@@ -0,0 +1,117 @@
+# encoding: utf-8
+"""Inventory-aware shortage solver.
+
+Needed resources are netted against what the user holds (``files/user_resources.csv``, plus the
+rewards of upcoming events in ``files/event_resources.csv``), crafting missing resources from their ingredients where a
+recipe exists, in a single pass over the recipe graph from products down to base materials.
+"""
+import csv
+import warnings
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from arknights import crafting as workshop
+
+# Names used by the inventory files for resources the game data knows under another name
+RESOURCE_ALIASES = {
+    'Strategic Battle Record': 'Strategic Battle Record - Brass Exp',
+    'Tactical Battle Record': 'Tactical Battle Record - Yellow Exp',
+    'Frontline Battle Record': 'Frontline Battle Record - Blue Exp',
+    'Drill Battle Record': 'Drill Battle Record - Green Exp',
+    'Crystalline Electronic Unit': 'Crystalline Electroassembly',
+    'Semi-Synthetic Solvent': 'Semi-natural Solvent',
+    'Cutting Fluid Solution': 'Cutting Stock Solution',
+}
+
+
+def load_inventory(csv_path: str, resources: Sequence[str]) -> np.ndarray:
+    """Quantities held, aligned with ``resources``, from a headerless ``resource,quantity`` csv."""
+    index = {name: i for i, name in enumerate(resources)}
+    inventory = np.zeros(len(resources), dtype=np.int64)
+    unknown = []
+    with open(csv_path, mode="r", encoding="utf-8") as f:
+        for name, quantity in csv.reader(f, delimiter=','):
+            name = RESOURCE_ALIASES.get(name, name)
+            if name in index:
+                inventory[index[name]] += int(quantity)
+            else:
+                unknown.append(name)
+    if unknown:
+        warnings.warn(f"Ignoring resources unknown to the game data in {csv_path}: {', '.join(unknown)}")
+    return inventory
+
+
+def load_event_resources(csv_path: str, resources: Sequence[str]) -> np.ndarray:
+    """Rewards of the events not done yet, aligned with ``resources``, from a ``done,event,<resource>...`` csv."""
+    index = {name: i for i, name in enumerate(resources)}
+    rewards = np.zeros(len(resources), dtype=np.int64)
+    unknown = set()
+    with open(csv_path, mode="r", encoding="utf-8") as f:
+        for row in csv.DictReader(f, delimiter=','):
+            if row.pop('done').strip().lower() == 'true':
+                continue
+            row.pop('event')
+            for name, quantity in row.items():
+                name = RESOURCE_ALIASES.get(name, name)
+                if name in index:
+                    rewards[index[name]] += int(quantity or 0)
+                else:
+                    unknown.add(name)
+    if unknown:
+        warnings.warn(f"Ignoring resources unknown to the game data in {csv_path}: {', '.join(sorted(unknown))}")
+    return rewards
+
+
+@dataclass(frozen=True)
+class ShortagePlan:
+    """Shortage after using the inventory and crafting, with a leading roster axis when solved in batch."""
+    resources: Tuple[str, ...]
+    shortage: np.ndarray  # (..., resource), still to be farmed
+    crafts: np.ndarray  # (..., resource), workshop crafts of each product
+    used: np.ndarray  # (..., resource), inventory consumed
+    lmd: np.ndarray  # (...,), workshop LMD, already part of the LMD shortage
+
+    def to_dict(self, quantities: np.ndarray) -> dict:
+        return {self.resources[i]: int(quantities[i]) for i in np.flatnonzero(quantities)}
+
+
+def solve(needed: np.ndarray, inventory: np.ndarray,
+          crafting: Optional[workshop.Crafting] = None) -> ShortagePlan:
+    """Net ``needed`` against ``inventory``, crafting whatever is missing and craftable.
+
+    Both are aligned with the crafting resources; ``needed`` may be one vector or a
+    (roster, resource) matrix, in which case every row is solved against its own copy of the inventory.
+    """
+    crafting = crafting or workshop.get_crafting()
+    demand = np.array(needed, dtype=np.int64, ndmin=2)
+    stock = np.broadcast_to(np.asarray(inventory, dtype=np.int64), demand.shape).copy()
+    shortage = np.zeros_like(demand)
+    crafts = np.zeros_like(demand)
+    craftable = crafting.craftable
+    lmd_index = crafting.resources.index('LMD')
+
+    # Products before their ingredients, so crafting demand is known before an ingredient is netted
+    for product in crafting.order[::-1]:
+        if product == lmd_index:
+            continue
+        taken = np.minimum(demand[:, product], stock[:, product])
+        stock[:, product] -= taken
+        missing = demand[:, product] - taken
+        if craftable[product]:
+            crafts[:, product] = missing
+            demand += missing[:, None] * crafting.recipes[product]
+        else:
+            shortage[:, product] = missing
+
+    lmd = crafts @ crafting.lmd_cost
+    demand[:, lmd_index] += lmd
+    taken = np.minimum(demand[:, lmd_index], stock[:, lmd_index])
+    stock[:, lmd_index] -= taken
+    shortage[:, lmd_index] = demand[:, lmd_index] - taken
+
+    used = np.broadcast_to(inventory, demand.shape) - stock
+    if np.ndim(needed) == 1:
+        shortage, crafts, used, lmd = shortage[0], crafts[0], used[0], lmd[0]
+    return ShortagePlan(resources=crafting.resources, shortage=shortage, crafts=crafts, used=used, lmd=lmd)
@@ -1,20 +1,57 @@
 # encoding: utf-8
 import csv
-from collections import Counter
-from dataclasses import dataclass
-from functools import reduce
-from pathlib import Path
-from typing import Optional, List, Dict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Callable, Dict
 
+from arknights import catalog
 from arknights import constants
-from arknights import utils
+from arknights import schema
+
+if TYPE_CHECKING:
+    from arknights.registry import CostVector
+
+
+STATE_FIELDS = frozenset({
+    'level', 'stars', 'elite_level', 'skill_level',
+    's1_mastery', 's2_mastery', 's3_mastery', 's4_mastery', 's5_mastery'
+})
+
+
+# Resource property name -> cached CostVector getter, see Operator.cost_vector
+COST_VECTORS: Dict[str, Callable[['Operator'], 'CostVector']] = dict()
+
+
+def cached_cost(method):
+    """Resource property computed as a CostVector, cached per operator until one of its STATE_FIELDS changes.
+
+    The property itself returns a fresh ``{resource: quantity}`` dict, callers are free to mutate it.
+    """
+    key = method.__name__
+
+    def vector(self) -> 'CostVector':
+        if self._cost_cache is None:
+            self._cost_cache = dict()
+        try:
+            return self._cost_cache[key]
+        except KeyError:
+            value = self._cost_cache[key] = method(self).freeze()
+            return value
+
+    def getter(self):
+        return vector(self).to_dict()
+
+    getter.__name__, getter.__doc__ = key, method.__doc__
+    COST_VECTORS[key] = vector
+    return property(getter)
+
+
+def zero_costs() -> 'CostVector':
+    from arknights import registry  # numpy is only imported once a cost is computed
+    return registry.get_registry().vector()
 
 
 def get_operators_data():
-    data = []
-    for path in Path(constants.Paths.OPERATORS_PATH.value).resolve().glob('*/*.json'):
-        data.append(utils.read_json(str(path)))
-    return data
+    return [schema.to_json(operator) for operator in catalog.read_game_data().operators.values()]
 
 
 def instantiate_operator(operator_dict: dict):
@@ -32,14 +69,20 @@ def instantiate_operator(operator_dict: dict):
 
 
 def load_operators(csv_path: str):
+    operators = []
     with open(csv_path, mode="r", encoding="utf-8") as f:
-        operators_data = [dict(user_operator) for user_operator in csv.DictReader(f, delimiter=';')]
-    operators = [instantiate_operator(operator_data) for operator_data in operators_data]
+        reader = csv.DictReader(f, delimiter=';')
+        for user_operator in reader:
+            try:
+                operators.append(instantiate_operator(user_operator))
+            except (KeyError, ValueError) as error:
+                raise type(error)(f"{csv_path}, line {reader.line_num}: {error.args[0]}") from None
     return operators
 
 
-@dataclass
+@dataclass(slots=True)
 class Operator:
+    """User state of an operator; static game data is the shared ``catalog.OperatorData`` of its name."""
     name: str = None  # General
     level: int = 0  # General
     stars: Optional[int] = 0  # General
@@ -50,91 +93,71 @@ class Operator:
     s3_mastery: Optional[int] = 0  # Masteries
     s4_mastery: Optional[int] = 0  # Amiya Masteries
     s5_mastery: Optional[int] = 0  # Amiya Masteries
+    data: catalog.OperatorData = field(default=None, init=False, repr=False, compare=False)
+    _cost_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Load operator info"""
-        path = Path(constants.Paths.OPERATORS_PATH.value)
-        operator_json_path = list(path.rglob(f'*/{self.name}.json'))
-        self.json_data = utils.read_json(file_path=str(operator_json_path[0]), show=False)
-        self.stars = self.json_data['stars']
+        self.data = catalog.get_catalog().operator_data(self.name)
+        self.stars = self.data.stars
+
+    def __setattr__(self, key, value):
+        # Zero-argument super() does not work in slotted dataclasses
+        if key in STATE_FIELDS and getattr(self, '_cost_cache', None):
+            self._cost_cache.clear()
+        object.__setattr__(self, key, value)
+
+    @property
+    def json_data(self) -> schema.Operator:
+        return catalog.get_catalog().operator(self.name)
+
+    def cost_vector(self, name: str) -> 'CostVector':
+        """Read-only CostVector behind one of the resource properties, e.g. ``'needed_resources'``."""
+        return COST_VECTORS[name](self)
+
+    def _step_costs(self, levels, reached=None) -> 'CostVector':
+        """Sum of the resources of game data upgrade levels, stopping at the first level above ``reached``."""
+        vector = zero_costs()
+        for level in levels:
+            if reached is not None and level.level > reached:
+                break
+            vector.add_entries(level.resources)
+        return vector
 
     # region Totals
+    # Totals only depend on the operator, they are shared by every instance of the same name
     # Elite
-    @property
+    @cached_cost
     def total_elite_resources(self):
-        resources = dict()
-        for elite in self.json_data['elite']:
-            for resource in elite['resources']:
-                key, value = resource['name'], resource['quantity']
-                resources[key] = resources.get(key, 0) + value
-        return resources
+        return self.data.total_costs('elite')
 
     # Skill
-    @property
+    @cached_cost
     def total_skill_resources(self):
-        upgrades_resources: List[Dict] = list()
-        for level in self.json_data['skills']['upgrade']:
-            level_resources = dict()
-            for resource in level['resources']:
-                key, value = resource['name'], resource['quantity']
-                level_resources[key] = level_resources.get(key, 0) + value
-            upgrades_resources.append(level_resources)
-        resources = reduce(lambda x, y: dict(Counter(x) + Counter(y)), upgrades_resources)
-        return resources
+        return self.data.total_costs('skill')
 
     # Mastery
-    @property
+    @cached_cost
     def total_mastery_resources(self):
-        if self.stars <= 3:
-            return {}
-        mastery_resources: List[Dict] = list()
-        for mastery in self.json_data['skills']['mastery']:
-            for level in mastery['upgrade']:
-                level_resources = dict()
-                for resource in level['resources']:
-                    key, value = resource['name'], resource['quantity']
-                    level_resources[key] = level_resources.get(key, 0) + value
-                mastery_resources.append(level_resources)
-        resources = reduce(lambda x, y: dict(Counter(x) + Counter(y)), mastery_resources)
-        return resources
+        return self.data.total_costs('mastery')
 
     # Total
-    @property
+    @cached_cost
     def total_resources(self):
-        total = dict()
-        total = Counter(total) + Counter(self.total_skill_resources)
-        total = Counter(total) + Counter(self.total_elite_resources)
-        total = Counter(total) + Counter(self.total_mastery_resources)
-        return dict(total)
+        return self.data.total_costs()
 
     # endregion
 
     # region Spent
-    @property
+    @cached_cost
     def spent_elite_resources(self):
-        resources = dict()
-        for elite in self.json_data['elite']:
-            if self.elite_level < elite['level']:
-                break
-            for resource in elite['resources']:
-                key = resource['name']
-                value = resource['quantity']
-                resources[key] = resources.get(key, 0) + value
-        return resources
+        return self._step_costs(self.data.elite, reached=self.elite_level)
 
-    @property
+    @cached_cost
     def spent_skill_resources(self):
-        resources = dict()
-        for skill in self.json_data['skills']['upgrade']:
-            if self.skill_level < skill['level']:
-                break
-            for resource in skill['resources']:
-                key = resource['name']
-                value = resource['quantity']
-                resources[key] = resources.get(key, 0) + value
-        return resources
+        return self._step_costs(self.data.skill_upgrades, reached=self.skill_level)
 
-    @property
+    @cached_cost
     def spent_mastery_resources(self):
         operator_masteries = {
             's1_mastery': self.s1_mastery,
@@ -143,70 +166,63 @@ class Operator:
             's4_mastery': self.s4_mastery,
             's5_mastery': self.s5_mastery
         }
-        resources = dict()
-        for mastery in self.json_data['skills']['mastery']:
-            skill_mastery = int(operator_masteries[f's{mastery["skill"]}_mastery'])
+        vector = zero_costs()
+        for mastery in self.data.masteries:
+            skill_mastery = int(operator_masteries[f's{mastery.skill}_mastery'])
             if skill_mastery <= 0:
                 continue
-            for level in mastery['upgrade']:
-                if level['level'] > skill_mastery:
-                    break
-                for resource in level['resources']:
-                    key = resource['name']
-                    value = resource['quantity']
-                    resources[key] = resources.get(key, 0) + value
-        return resources
+            vector += self._step_costs(mastery.upgrade, reached=skill_mastery)
+        return vector
 
-    @property
+    @cached_cost
     def spent_resources(self):
-        total = dict()
-        total = Counter(total) + Counter(self.spent_skill_resources)
-        total = Counter(total) + Counter(self.spent_elite_resources)
-        total = Counter(total) + Counter(self.spent_mastery_resources)
-        return dict(total)
+        total = self.cost_vector('spent_skill_resources').copy()
+        total += self.cost_vector('spent_elite_resources')
+        total += self.cost_vector('spent_mastery_resources')
+        return total
 
     # endregion
 
     # region Needed
-    @property
+    def _needed(self, track: str) -> 'CostVector':
+        needed = self.cost_vector(f'total_{track}').copy()
+        needed -= self.cost_vector(f'spent_{track}')
+        return needed.clip()
+
+    @cached_cost
     def needed_elite_resources(self):
-        resources = Counter(self.total_elite_resources) - Counter(self.spent_elite_resources)
-        return dict(resources)
+        return self._needed('elite_resources')
 
-    @property
+    @cached_cost
     def needed_skill_resources(self):
-        resources = Counter(self.total_skill_resources) - Counter(self.spent_skill_resources)
-        return dict(resources)
+        return self._needed('skill_resources')
 
-    @property
+    @cached_cost
     def needed_mastery_resources(self):
-        resources = Counter(self.total_mastery_resources) - Counter(self.spent_mastery_resources)
-        return dict(resources)
+        return self._needed('mastery_resources')
 
-    @property
+    @cached_cost
     def needed_resources(self):
-        return dict(Counter(self.total_resources) - Counter(self.spent_resources))
+        return self._needed('resources')
 
     # endregion
 
     # region Quantities
+    def _material_quantity(self, name: str) -> int:
+        vector = self.cost_vector(name)
+        return vector.total() - vector['LMD']
+
     @property
     def total_material_quantity(self):
-        total_resources = self.total_resources
-        total_resources.pop('LMD', None)
-        return sum(total_resources.values())
+        return self._material_quantity('total_resources')
 
     @property
     def spent_material_quantity(self):
-        spent_resources = self.spent_resources
-        spent_resources.pop('LMD', None)
-        return sum(spent_resources.values())
+        return self._material_quantity('spent_resources')
 
     @property
     def needed_material_quantity(self):
-        needed_resources = self.needed_resources
-        needed_resources.pop('LMD', None)
-        return sum(needed_resources.values())
+        return self._material_quantity('needed_resources')
 
     @property
     def material_percentage(self):
@@ -220,14 +236,13 @@ class Operator:
     # region LMD
     @property
     def total_lmd(self):
-        max_elite = int(list(constants.Paths.EXP_DATA.value[self.stars])[-1].replace("elite_", ''))
-        max_level = list(constants.Paths.EXP_DATA.value[self.stars][f"elite_{max_elite}"])[-1]
-        accumulated_lmd = constants.Paths.EXP_DATA.value[self.stars][f"elite_{max_elite}"][max_level]['accumulated lmd']
+        max_elite, max_level = constants.get_max_level(self.stars)
+        accumulated_lmd = constants.get_exp_data(self.stars)[max_elite][max_level]['accumulated lmd']
         return accumulated_lmd
 
     @property
     def spent_lmd(self):
-        lmd = constants.Paths.EXP_DATA.value[self.stars][f"elite_{self.elite_level}"][self.level]['accumulated lmd']
+        lmd = constants.get_exp_data(self.stars)[f"elite_{self.elite_level}"][self.level]['accumulated lmd']
         return lmd
 
     @property
@@ -240,22 +255,21 @@ class Operator:
 
     @property
     def spent_elite_lmd(self):
-        return self.spent_elite_resources.get('LMD', 0)
+        return self.cost_vector('spent_elite_resources')['LMD']
 
     # endregion LMD
 
     # region EXP
     @property
     def total_yellow_exp(self):
-        max_elite = int(list(constants.Paths.EXP_DATA.value[self.stars])[-1].replace("elite_", ''))
-        max_level = list(constants.Paths.EXP_DATA.value[self.stars][f"elite_{max_elite}"])[-1]
-        accumulated_exp = constants.Paths.EXP_DATA.value[self.stars][f"elite_{max_elite}"][max_level]['accumulated exp']
+        max_elite, max_level = constants.get_max_level(self.stars)
+        accumulated_exp = constants.get_exp_data(self.stars)[max_elite][max_level]['accumulated exp']
         yellow_ticket = int(accumulated_exp / 1000)
         return yellow_ticket
 
     @property
     def spent_yellow_exp(self):
-        exp = constants.Paths.EXP_DATA.value[self.stars][f"elite_{self.elite_level}"][self.level]['accumulated exp']
+        exp = constants.get_exp_data(self.stars)[f"elite_{self.elite_level}"][self.level]['accumulated exp']
         yellow_ticket = int(exp / 1000)
         return yellow_ticket
 
@@ -0,0 +1,106 @@
+# encoding: utf-8
+"""Goal-based planning: cost from each operator's current state to a target state.
+
+Targets are given as ``target_*`` columns, either directly in ``user_operators.csv`` or in a
+sidecar csv with a ``name`` column (``arknights-calc report plan --targets``). A blank target keeps
+the current value, and targets below the current state cost nothing, e.g. "E2 L1, S7, M3 on S2" is::
+
+    name;target_elite;target_level;target_skill_level;target_s2_mastery
+    Exusiai;2;1;7;3
+"""
+import warnings
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from arknights import engine as cost_engine
+from arknights import explmd
+from arknights.roster import ROSTER_DEFAULTS, TARGET_COLUMNS, TARGET_PREFIX
+
+STATE_COLUMNS = tuple(ROSTER_DEFAULTS)
+
+
+def load_targets(csv_path: str) -> pd.DataFrame:
+    """Sidecar targets, one row per operator name: of names listed more than once, the last row is kept."""
+    targets = pd.read_csv(csv_path, sep=';', encoding='utf-8', dtype={column: 'Int64' for column in TARGET_COLUMNS},
+                          usecols=lambda column: column == 'name' or column in TARGET_COLUMNS)
+    duplicated = targets['name'].duplicated(keep='last')
+    if duplicated.any():
+        names = ', '.join(sorted(set(targets.loc[duplicated, 'name'])))
+        warnings.warn(f"Targets listed more than once in {csv_path}, keeping the last ones: {names}")
+        targets = targets[~duplicated]
+    return targets
+
+
+def with_targets(roster: pd.DataFrame, targets: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Roster with every TARGET_COLUMNS filled in, blank targets taking the current value.
+
+    ``targets`` (one row per name, see ``load_targets``) replaces the roster's own target columns it has.
+    The roster index is kept.
+    """
+    roster = roster.copy()
+    if targets is not None:
+        if targets['name'].duplicated().any():
+            raise ValueError("Targets must list each operator name once")
+        target_columns = [column for column in targets.columns if column in TARGET_COLUMNS]
+        merged = roster.drop(columns=target_columns, errors='ignore') \
+            .merge(targets[['name'] + target_columns], on='name', how='left')
+        merged.index = roster.index
+        roster = merged
+    for column, target_column in zip(STATE_COLUMNS, TARGET_COLUMNS):
+        current = roster[column] if column in roster else 0
+        if target_column in roster:
+            roster[target_column] = roster[target_column].fillna(current)
+        else:
+            roster[target_column] = current
+    return roster
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Cost from current to target state, one row per roster row."""
+    names: Tuple[str, ...]
+    resources: Tuple[str, ...]
+    materials: np.ndarray  # (row, resource), promotion LMD included in the LMD column
+    leveling_lmd: np.ndarray  # (row,)
+    exp: np.ndarray  # (row,)
+
+    @property
+    def lmd(self) -> np.ndarray:
+        return self.materials[:, self.resources.index('LMD')] + self.leveling_lmd
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide table: one column per resource, LMD including leveling, plus the EXP needed."""
+        frame = pd.DataFrame(self.materials, columns=list(self.resources))
+        frame['LMD'] = self.lmd
+        frame['EXP'] = self.exp
+        frame.insert(0, 'name', list(self.names))
+        return frame
+
+    def total(self) -> pd.Series:
+        return self.to_frame().drop(columns=['name']).sum(axis=0)
+
+
+def plan(roster: pd.DataFrame, targets: Optional[pd.DataFrame] = None,
+         engine: Optional[cost_engine.CostEngine] = None, table: Optional[explmd.ExpLmdTable] = None) -> Plan:
+    """Batched cost of bringing every roster row to its target state."""
+    engine = engine or cost_engine.get_engine()
+    table = table or explmd.get_table()
+    roster = with_targets(roster, targets)
+
+    operators = engine.indices(roster['name'])
+    current = engine.state_matrix(roster)
+    target = np.column_stack([roster[f'{TARGET_PREFIX}{column}'].to_numpy(dtype=np.int64)
+                              for column in cost_engine.STATE_COLUMNS])
+    materials = engine.cost_between(operators, current, np.maximum(current, target))
+
+    # Leveling only moves forward: a target (elite, level) below the current one costs nothing
+    stars = engine.stars[operators].astype(np.int64)
+    level = roster['level'].to_numpy(dtype=np.int64)
+    target_level = roster['target_level'].to_numpy(dtype=np.int64)
+    leveling_lmd = np.clip(table.lmd_between(stars, current[:, 0], level, target[:, 0], target_level), 0, None)
+    exp = np.clip(table.exp_between(stars, current[:, 0], level, target[:, 0], target_level), 0, None)
+    return Plan(names=tuple(roster['name']), resources=engine.resources, materials=materials,
+                leveling_lmd=leveling_lmd, exp=exp)
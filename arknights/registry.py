@@ -0,0 +1,133 @@
+# encoding: utf-8
+"""Resource registry and fixed-width cost vectors.
+
+Every resource known to the game data gets a small integer id, so costs are ``int64`` arrays
+indexed by id and added or subtracted in place. Names only show up at the edges, when game data
+entries are read in and when vectors are turned back into ``{resource: quantity}`` dicts.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Tuple
+
+import numpy as np
+
+from arknights import catalog, schema
+
+
+def resource_names(game_catalog: catalog.Catalog) -> Tuple[str, ...]:
+    """Sorted names of every catalog resource and every resource an operator upgrade uses."""
+    names = set(game_catalog.resources)
+    for operator in game_catalog.operators.values():
+        for elite in operator.elite:
+            names.update(resource.name for resource in elite.resources)
+        for level in operator.skills.upgrade:
+            names.update(resource.name for resource in level.resources)
+        for mastery in operator.skills.mastery:
+            for level in mastery.upgrade:
+                names.update(resource.name for resource in level.resources)
+    return tuple(sorted(names))
+
+
+@dataclass(frozen=True)
+class ResourceRegistry:
+    names: Tuple[str, ...]
+    ids: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'ids', {name: i for i, name in enumerate(self.names)})
+
+    @classmethod
+    def from_catalog(cls, game_catalog: catalog.Catalog) -> 'ResourceRegistry':
+        return cls(names=resource_names(game_catalog))
+
+    def __len__(self):
+        return len(self.names)
+
+    def id(self, name: str) -> int:
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise KeyError(f"Unknown resource: {name!r}") from None
+
+    def vector(self) -> 'CostVector':
+        """Zero cost vector."""
+        return CostVector(self, np.zeros(len(self.names), dtype=np.int64))
+
+    def from_dict(self, quantities: Mapping[str, int]) -> 'CostVector':
+        vector = self.vector()
+        for name, quantity in quantities.items():
+            vector.values[self.id(name)] += quantity
+        return vector
+
+    def matrix(self, vectors: Iterable['CostVector']) -> np.ndarray:
+        """(vector, resource) array, for roster-wide sums in a single operation."""
+        rows = [vector.values for vector in vectors]
+        return np.stack(rows) if rows else np.zeros((0, len(self.names)), dtype=np.int64)
+
+
+class CostVector:
+    """Resource quantities of one registry as an ``int64`` array indexed by resource id."""
+    __slots__ = ('registry', 'values')
+
+    def __init__(self, registry: ResourceRegistry, values: np.ndarray):
+        self.registry = registry
+        self.values = values
+
+    def add_entries(self, resources: Iterable[schema.Resource]) -> 'CostVector':
+        """Add game data resource entries in place."""
+        ids, values = self.registry.ids, self.values
+        for resource in resources:
+            values[ids[resource.name]] += resource.quantity
+        return self
+
+    def clip(self) -> 'CostVector':
+        """Drop negative quantities in place, like ``Counter`` subtraction."""
+        np.maximum(self.values, 0, out=self.values)
+        return self
+
+    def copy(self) -> 'CostVector':
+        return CostVector(self.registry, self.values.copy())
+
+    def freeze(self) -> 'CostVector':
+        """Make the vector read-only, so a shared (cached) vector cannot be changed by accident."""
+        self.values.flags.writeable = False
+        return self
+
+    def __iadd__(self, other: 'CostVector') -> 'CostVector':
+        self.values += other.values
+        return self
+
+    def __isub__(self, other: 'CostVector') -> 'CostVector':
+        self.values -= other.values
+        return self
+
+    def __add__(self, other: 'CostVector') -> 'CostVector':
+        return CostVector(self.registry, self.values + other.values)
+
+    def __sub__(self, other: 'CostVector') -> 'CostVector':
+        return CostVector(self.registry, self.values - other.values)
+
+    def __getitem__(self, name: str) -> int:
+        return int(self.values[self.registry.id(name)])
+
+    def __eq__(self, other):
+        if not isinstance(other, CostVector):
+            return NotImplemented
+        return self.registry.names == other.registry.names and np.array_equal(self.values, other.values)
+
+    def __repr__(self):
+        return f"CostVector({self.to_dict()})"
+
+    def total(self) -> int:
+        return int(self.values.sum())
+
+    def to_dict(self) -> Dict[str, int]:
+        """``{resource: quantity}`` without zero entries."""
+        names = self.registry.names
+        return {names[i]: int(self.values[i]) for i in np.flatnonzero(self.values)}
+
+
+@lru_cache(maxsize=None)
+def get_registry() -> ResourceRegistry:
+    """Process-wide registry of the game catalog resources."""
+    return ResourceRegistry.from_catalog(catalog.get_catalog())
@@ -0,0 +1,254 @@
+# encoding: utf-8
+"""Report tables, each one a projection of a shared RosterFrame."""
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from arknights import crafting as workshop
+from arknights import inventory as user_inventory
+from arknights import planner
+from arknights.roster import RosterFrame, build_frame, empty_roster
+
+INDEX_COLUMNS = ['operator', 'stars', 'elite', 'level', 'skill_level', 'overall_percentage']
+SORT_COLUMNS = ['overall_percentage', 'stars', 'elite', 'skill_level', 'level', 'operator']
+YELLOW_EXP = 'Tactical Battle Record - Yellow Exp'
+PLAN_INDEX_COLUMNS = ['name', 'elite', 'level', 'skill_level', 'target_elite', 'target_level', 'target_skill_level']
+
+
+def resources_frame(resources_data: list) -> pd.DataFrame:
+    return pd.DataFrame(resources_data).rename(columns={'name': 'Resource'}).set_index('Resource')
+
+
+def format_resources(frame: RosterFrame, metric: str) -> list:
+    """``'{quantity}x {resource}'`` lines of every roster row, resources in alphabetical order."""
+    quantities = frame.entries(metric).groupby(['row', 'resource'], observed=True)['quantity'].sum().sort_index()
+    lines = pd.Series(quantities.astype(str).to_numpy() + 'x '
+                      + quantities.index.get_level_values('resource').astype(str).to_numpy(), index=quantities.index)
+    return lines.groupby(level='row').agg('\n'.join).reindex(frame.info.index, fill_value='').tolist()
+
+
+def operator_resources(frame: RosterFrame, table: pd.DataFrame, lmd: pd.Series, yellow_exp: pd.Series) -> pd.DataFrame:
+    """One row per operator, one column per resource, LMD including leveling and yellow EXP records."""
+    resume = table.copy()
+    resume['LMD'] = lmd
+    resume[YELLOW_EXP] = yellow_exp
+    resume.index = pd.MultiIndex.from_frame(frame.info[INDEX_COLUMNS])
+    resume = resume.reindex(sorted(resume.columns), axis=1)
+    resume = resume.sort_values(by=SORT_COLUMNS)
+    resume = resume.astype('int64')
+    return resume.replace(0, np.nan)
+
+
+def resource_totals(table: pd.DataFrame, lmd: pd.Series, yellow_exp: pd.Series) -> pd.DataFrame:
+    """Quantity of each resource summed over the roster."""
+    resume = table.copy()
+    resume['LMD'] = lmd
+    resume[YELLOW_EXP] = yellow_exp
+    resume = resume.sum(axis=0).to_frame(name='Quantity')
+    resume.index.names = ['Resource']
+    resume['Quantity'] = resume.Quantity.astype('int64')
+    resume = resume.sort_values(by=['Resource'])
+    return resume.replace(0, np.nan)
+
+
+def calc_resume(df1, df2, df3, df_resources) -> pd.DataFrame:
+    renamed_columns = {'Resource': 'Resource', 'Quantity_global': 'Total', 'Quantity_spent': 'Spent',
+                       'Quantity': 'Needed', 'tier': 'Tier', 'droppable': 'Droppable', 'lmd': 'LMD'}
+    columns_order = ['Tier', 'LMD', 'Droppable', 'Total', 'Spent', 'Needed']
+    resume = df1 \
+        .join(df2, lsuffix='_global', rsuffix='_spent') \
+        .join(df3, lsuffix='_global', rsuffix='_needed') \
+        .join(df_resources, lsuffix='_global', rsuffix='_resources') \
+        .rename(columns=renamed_columns)[columns_order] \
+        .sort_values(by=['Resource', 'Tier'])
+    resume['Percentage'] = np.round(resume['Spent'] / resume['Total'], decimals=4)
+    return resume
+
+
+def needed_resource(frame: RosterFrame) -> pd.DataFrame:
+    info = frame.info
+    table = frame.resources('needed_resources')
+    return operator_resources(frame, table,
+                              lmd=table.get('LMD', 0) + info['needed_lmd'],
+                              yellow_exp=info['needed_yellow_exp'])
+
+
+def spent_resource(frame: RosterFrame) -> pd.DataFrame:
+    info = frame.info
+    return operator_resources(frame, frame.resources('spent_resources'),
+                              lmd=info['spent_elite_lmd'] + info['spent_lmd'],
+                              yellow_exp=info['spent_yellow_exp'])
+
+
+def total_resource(frame: RosterFrame, df_resources: pd.DataFrame) -> pd.DataFrame:
+    info = frame.info
+    total_table = frame.resources('total_resources')
+    needed_table = frame.resources('needed_resources')
+    total_resources = resource_totals(total_table,
+                                      lmd=total_table.get('LMD', 0) + info['total_lmd'],
+                                      yellow_exp=info['total_yellow_exp'])
+    spent_resources = resource_totals(frame.resources('spent_resources'),
+                                      lmd=info['spent_elite_lmd'] + info['spent_lmd'],
+                                      yellow_exp=info['spent_yellow_exp'])
+    needed_resources = resource_totals(needed_table,
+                                       lmd=needed_table.get('LMD', 0) + info['needed_lmd'],
+                                       yellow_exp=info['needed_yellow_exp'])
+    resume = calc_resume(total_resources, spent_resources, needed_resources, df_resources)
+    resume = resume.fillna(0)
+    resume.Spent = resume.Spent.astype('int64')
+    resume.LMD = resume.LMD.astype('int64')
+    resume.Tier = resume.Tier.astype('int64')
+    resume.Percentage = (resume.Percentage * 100).round(2)
+    return resume
+
+
+def combine_totals(tables) -> pd.DataFrame:
+    """``total_resource`` tables of several rosters summed into the table of all of them together."""
+    combined = pd.concat(tables)
+    resume = combined.groupby(level='Resource', sort=True).agg(
+        {'Tier': 'first', 'LMD': 'first', 'Droppable': 'first', 'Total': 'sum', 'Spent': 'sum', 'Needed': 'sum'})
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resume['Percentage'] = (np.round(resume['Spent'] / resume['Total'], decimals=4) * 100).round(2)
+    return resume.fillna({'Percentage': 0})
+
+
+def stream_total_resource(chunks, df_resources: pd.DataFrame, engine=None, table=None,
+                          on_frame: Optional[Callable[[RosterFrame], None]] = None) -> pd.DataFrame:
+    """``total_resource`` of a roster read chunk by chunk (``roster.iter_roster``), so only one chunk is in
+    memory at a time. ``on_frame`` is called with the frame of every chunk."""
+    totals = None
+    for chunk in chunks:
+        frame = build_frame(chunk.roster, engine=engine, table=table)
+        if on_frame is not None:
+            on_frame(frame)
+        chunk_totals = total_resource(frame, df_resources)
+        totals = chunk_totals if totals is None else combine_totals([totals, chunk_totals])
+    if totals is None:
+        return total_resource(build_frame(empty_roster(), engine=engine, table=table), df_resources)
+    return totals
+
+
+def resources(frame: RosterFrame, df_resources: pd.DataFrame) -> pd.DataFrame:
+    """Total, spent and needed material quantities, leveling LMD and EXP excluded."""
+    def roster_sum(metric):
+        quantities = frame.entries(metric).groupby('resource', observed=True)['quantity'].sum()
+        quantities.index = quantities.index.astype(str)
+        return quantities.rename_axis('Resource').to_frame(name='Quantity').astype({'Quantity': 'int32'})
+
+    total_resources = roster_sum('total_resources')
+    spent_resources = roster_sum('spent_resources').reindex_like(total_resources).fillna(0)
+    needed_resources = roster_sum('needed_resources').reindex_like(total_resources).fillna(0)
+    return calc_resume(total_resources, spent_resources, needed_resources, df_resources)
+
+
+def resources_by_operator(frame: RosterFrame) -> pd.DataFrame:
+    resume = frame.info.copy()
+    for metric in ['elite_resources', 'mastery_resources', 'spent_resources', 'needed_elite_resources',
+                   'needed_mastery_resources', 'needed_skill_resources', 'needed_resources']:
+        resume[metric] = format_resources(frame, metric)
+    resume = resume \
+        .set_index('operator') \
+        .sort_values(by=['stars', 'operator', 'material_percentage'], ascending=False)
+    column_order = [
+        'overall_percentage',
+        'material_percentage',
+        'lmd_percentage',
+        'yellow_exp_percentage',
+        'stars',
+        'elite',
+        'skill_level',
+        's1_mastery',
+        's2_mastery',
+        's3_mastery',
+        'elite_resources',
+        'mastery_resources',
+        'spent_resources',
+        'needed_elite_resources',
+        'needed_mastery_resources',
+        'needed_skill_resources',
+        'needed_resources',
+        'needed_material_quantity',
+        'total_material_quantity',
+        'spent_yellow_exp',
+        'needed_yellow_exp',
+        'spent_lmd',
+        'needed_lmd',
+        'total_yellow_exp',
+        'total_lmd'
+    ]
+    return resume[column_order]
+
+
+def needed_totals(frame: RosterFrame, resources) -> np.ndarray:
+    """Roster-wide needed quantity of each of ``resources``, leveling LMD and yellow EXP records included."""
+    quantities = frame.entries('needed_resources').groupby('resource', observed=False)['quantity'].sum()
+    quantities.index = quantities.index.astype(str)
+    needed = quantities.reindex(list(resources), fill_value=0).to_numpy(dtype=np.int64)
+    needed[resources.index('LMD')] += frame.info['needed_lmd'].sum()
+    needed[resources.index(YELLOW_EXP)] += frame.info['needed_yellow_exp'].sum()
+    return needed
+
+
+def crafting_needs(frame: RosterFrame, crafting: Optional[workshop.Crafting] = None) -> pd.DataFrame:
+    """What the roster still needs before and after crafting: tier 5 resources broken down to their tier 4
+    ingredients, then every craftable resource to base materials. The LMD of the crafted columns includes
+    the workshop LMD, also given on its own in the 'Workshop LMD' row."""
+    crafting = crafting or workshop.get_crafting()
+    needed = needed_totals(frame, crafting.resources)
+    lmd = crafting.resources.index('LMD')
+    columns, workshop_lmd = {'Needed': needed}, {'Needed': 0}
+    for column, min_tier in (('Tier 5 Crafted', 5), ('All Crafted', 1)):
+        quantities, crafting_lmd = crafting.expand(needed, min_tier=min_tier)
+        quantities[lmd] += crafting_lmd
+        columns[column], workshop_lmd[column] = quantities, int(crafting_lmd)
+    resume = pd.DataFrame(columns, index=pd.Index(crafting.resources, name='Resource'))
+    resume = resume[resume.to_numpy().any(axis=1)]
+    resume.loc['Workshop LMD'] = workshop_lmd
+    resume.insert(0, 'Tier', pd.Series(crafting.tiers, index=crafting.resources).reindex(resume.index)
+                  .fillna(crafting.tiers[lmd]).astype('int64'))
+    return resume.sort_index().replace(0, np.nan)
+
+
+def shortage(frame: RosterFrame, held: np.ndarray, crafting: Optional[workshop.Crafting] = None) -> pd.DataFrame:
+    """What the roster still needs against the inventory: held, used, crafted and still missing per resource."""
+    crafting = crafting or workshop.get_crafting()
+    needed = needed_totals(frame, crafting.resources)
+    plan = user_inventory.solve(needed, held, crafting)
+    resume = pd.DataFrame({'Needed': needed, 'Held': held, 'Used': plan.used, 'Crafts': plan.crafts,
+                           'Shortage': plan.shortage}, index=pd.Index(crafting.resources, name='Resource'))
+    return resume[resume.to_numpy().any(axis=1)]
+
+
+def plan_resources(user_roster: pd.DataFrame, plan: planner.Plan) -> pd.DataFrame:
+    """Resources from the current state to the target of every operator with something left to do, the roster
+    with its targets filled in (``planner.with_targets``)."""
+    resume = plan.to_frame().drop(columns=['name'])
+    resume.index = pd.MultiIndex.from_frame(
+        user_roster[PLAN_INDEX_COLUMNS].astype({column: 'int64' for column in PLAN_INDEX_COLUMNS[1:]})
+        .rename(columns={'name': 'operator'}).reset_index(drop=True))
+    values = resume.to_numpy()
+    resume = resume.loc[values.any(axis=1), values.any(axis=0)]
+    resume = resume.reindex(sorted(resume.columns), axis=1)
+    return resume.replace(0, np.nan)
+
+
+def farming(frame: RosterFrame, held: np.ndarray, crafting: Optional[workshop.Crafting] = None,
+            stage_table=None) -> pd.DataFrame:
+    """Sanity-minimal stage runs and crafts covering what the roster still needs against the inventory, the
+    needs of the shortage report. Runs and crafts are rounded up to whole ones."""
+    from arknights import farming as stage_farming  # scipy is only imported for this report
+    crafting = crafting or workshop.get_crafting()
+    stage_table = stage_table or stage_farming.get_stages()
+    plan = stage_farming.optimize(needed_totals(frame, crafting.resources), held, stage_table, crafting)
+    stage_sanity = dict(zip(stage_table.stages, stage_table.sanity.astype(np.int64).tolist()))
+    crafts = plan.resource_crafts()
+    rows = [('Stage', stage, runs, runs * stage_sanity[stage]) for stage, runs in plan.stage_runs().items()]
+    rows += [('Craft', resource, quantity, 0) for resource, quantity in crafts.items()]
+    rows += [('Uncovered', crafting.resources[i], int(np.ceil(plan.uncovered[i])), 0)
+             for i in np.flatnonzero(plan.uncovered > 0)]
+    rows += [('Total', 'Sanity', sum(row[3] for row in rows), 0),
+             ('Total', 'Workshop LMD', sum(quantity * int(crafting.lmd_cost[crafting.resources.index(resource)])
+                                           for resource, quantity in crafts.items()), 0)]
+    resume = pd.DataFrame(rows, columns=['Kind', 'Name', 'Quantity', 'Sanity']).set_index(['Kind', 'Name'])
+    return resume.astype('int64').replace({'Sanity': {0: np.nan}})
@@ -1,16 +1,12 @@
 # encoding: utf-8
 from __future__ import annotations
 from dataclasses import dataclass, field
-from pathlib import Path
 
-from arknights import constants, utils
+from arknights import catalog, schema
 
 
 def get_resources_data():
-    data = []
-    for path in Path(constants.Paths.RESOURCES_PATH.value).resolve().glob('*/*.json'):
-        data.append(utils.read_json(str(path)))
-    return data
+    return [schema.to_json(resource) for resource in catalog.read_game_data().resources.values()]
 
 
 @dataclass
@@ -23,14 +19,11 @@ class Resource:
 
     def __post_init__(self):
         """Load resource data."""
-        path = Path(constants.Paths.RESOURCES_PATH.value)
-        resource_json_path = list(path.rglob(f'*/{self.name}.json'))
-        self.json_data = utils.read_json(file_path=str(resource_json_path[0]), show=False)
-        self.tier = self.json_data['tier']
-        self.drop = self.json_data['droppable']
-        self.recipe = self.json_data['recipe']
-        self.lmd_cost = self.json_data['lmd']
-        print(self.json_data)
+        self.json_data = catalog.get_catalog().resource(self.name)
+        self.tier = self.json_data.tier
+        self.drop = self.json_data.droppable
+        self.recipe = [schema.to_json(ingredient) for ingredient in self.json_data.recipe]
+        self.lmd_cost = self.json_data.lmd
 
 
 if __name__ == "__main__":
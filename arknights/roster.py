@@ -0,0 +1,355 @@
+# encoding: utf-8
+"""Roster frame: every per-operator metric of a roster, computed once.
+
+The frame holds the same metrics as ``Operator.to_dict`` for every row of ``user_operators.csv``,
+computed in a single vectorized pass, so reports only project and aggregate it. Resources are kept
+as the engine's long-format ledger, wide (row, resource) tables are pivoted from it on demand.
+"""
+import csv
+import warnings
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from arknights import engine as cost_engine
+from arknights import explmd
+
+# Defaults of columns missing from the roster csv, as in operator.instantiate_operator
+ROSTER_DEFAULTS = {
+    'level': 1, 'elite': 0, 'skill_level': 1,
+    's1_mastery': 0, 's2_mastery': 0, 's3_mastery': 0, 's4_mastery': 0, 's5_mastery': 0
+}
+
+# Resource metrics: name -> (ledger rows: total/spent/needed, track)
+RESOURCE_METRICS = {
+    'total_resources': ('total', None),
+    'spent_resources': ('spent', None),
+    'needed_resources': ('needed', None),
+    'elite_resources': ('total', 'elite'),
+    'skill_upgrade_resources': ('total', 'skill'),
+    'mastery_resources': ('total', 'mastery'),
+    'needed_elite_resources': ('needed', 'elite'),
+    'needed_skill_resources': ('needed', 'skill'),
+    'needed_mastery_resources': ('needed', 'mastery'),
+}
+
+
+def empty_roster() -> pd.DataFrame:
+    """Roster without rows, with the columns of a validated one."""
+    return pd.DataFrame({'name': pd.Series(dtype='string'),
+                         **{column: pd.Series(dtype='int64') for column in ROSTER_DEFAULTS}})
+
+
+# Columns of the state each row aims at, for the planner; blank ones keep the current value
+TARGET_PREFIX = 'target_'
+TARGET_COLUMNS = tuple(f'{TARGET_PREFIX}{column}' for column in ROSTER_DEFAULTS)
+
+DEFAULT_CHUNK_ROWS = 50_000
+MAX_REPORTED_ERRORS = 10  # Row errors listed in a warning, the others are only counted
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int  # Line of the csv file, the header being line 1
+    operator: str
+    message: str
+
+    def __str__(self):
+        return f"line {self.line} ({self.operator}): {self.message}"
+
+
+@dataclass(frozen=True)
+class RosterChunk:
+    roster: pd.DataFrame  # Valid rows, 'name', every ROSTER_DEFAULTS column and any TARGET_COLUMNS, indexed by csv line
+    errors: List[RowError]  # One per invalid row, in line order
+
+
+def flag_rows(messages: Dict[int, str], lines: pd.Index, mask: np.ndarray, message):
+    """Record ``message`` (or ``message(i)``) for the lines of ``mask``, keeping the first problem of a line."""
+    for i in np.flatnonzero(mask):
+        messages.setdefault(lines[i], message(i) if callable(message) else message)
+
+
+def check_states(flag: Callable, states: Dict[str, np.ndarray], stars: np.ndarray, known: np.ndarray,
+                 table: explmd.ExpLmdTable, label: str = ''):
+    """Flag ROSTER_DEFAULTS states beyond the rarity caps or out of range, ``label`` prefixing the messages."""
+    elite, level, skill_level = states['elite'], states['level'], states['skill_level']
+    elite_cap = table.elite_cap[stars]
+    flag(known & ((elite < 0) | (elite > elite_cap)),
+         lambda i: f"{label}elite {elite[i]} beyond the {stars[i]}-star cap of {elite_cap[i]}")
+    level_cap = table.level_cap[stars, np.clip(elite, 0, elite_cap)]
+    flag(known & ((level < 1) | (level > level_cap)),
+         lambda i: f"{label}level {level[i]} beyond the elite {elite[i]} cap of {level_cap[i]}")
+    flag(known & ((skill_level < 0) | (skill_level > cost_engine.SKILL_LEVELS)),
+         lambda i: f"{label}skill level {skill_level[i]} outside 0 to {cost_engine.SKILL_LEVELS}")
+    for skill in range(cost_engine.MASTERY_SKILLS):
+        column = f's{skill + 1}_mastery'
+        mastery = states[column]
+        flag(known & ((mastery < 0) | (mastery > cost_engine.MASTERY_LEVELS)),
+             lambda i, mastery=mastery, column=column: f"{label}{column} {mastery[i]} outside 0 to 3")
+        flag(known & (mastery > 0) & (stars <= 3),
+             lambda i, column=column: f"{label}{column} on a {stars[i]}-star operator")
+
+
+def target_states(roster: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """State each row aims at: its ``target_*`` columns, blank or missing ones taking the current value."""
+    states = dict()
+    for column, target_column in zip(ROSTER_DEFAULTS, TARGET_COLUMNS):
+        values = roster[target_column].fillna(roster[column]) if target_column in roster else roster[column]
+        states[column] = values.to_numpy(dtype=np.int64)
+    return states
+
+
+def roster_errors(roster: pd.DataFrame, names: pd.Series, messages: Dict[int, str]) -> RosterChunk:
+    errors = [RowError(line=int(line), operator='' if pd.isna(names[line]) else str(names[line]), message=message)
+              for line, message in sorted(messages.items())]
+    return RosterChunk(roster=roster.drop(index=list(messages)), errors=errors)
+
+
+def validate_roster(raw: pd.DataFrame, engine: Optional[cost_engine.CostEngine] = None,
+                    table: Optional[explmd.ExpLmdTable] = None) -> RosterChunk:
+    """Split csv rows read as strings, indexed by line, into valid roster rows and one error per invalid row.
+
+    A row is invalid when its operator is unknown, a state is not an integer, elite or level go beyond
+    the rarity caps, or a skill level or mastery is out of range. Missing states take the defaults.
+    ``target_*`` columns are kept, as nullable integers, and the targets are checked the same way.
+    """
+    engine = engine or cost_engine.get_engine()
+    table = table or explmd.get_table()
+    names = raw['name'] if 'name' in raw else pd.Series(pd.NA, index=raw.index, dtype=object)
+    messages = dict()  # Line -> first problem found
+    flag = partial(flag_rows, messages, raw.index)
+
+    indices = names.map(engine.operator_index)
+    known = indices.notna().to_numpy()
+    flag(~known, 'unknown operator')
+    operators = indices.fillna(0).to_numpy(dtype=np.intp)
+    stars = engine.stars[operators].astype(np.int64)
+
+    roster = pd.DataFrame({'name': names.astype('string')}, index=raw.index)
+    targets = [column for column in TARGET_COLUMNS if column in raw]
+    for column, default in list(ROSTER_DEFAULTS.items()) + [(column, None) for column in targets]:
+        text = raw[column] if column in raw else pd.Series(np.nan, index=raw.index, dtype=object)
+        try:
+            # Every cell an integer, ten times faster than to_numeric
+            roster[column] = text.astype('int64' if default is not None else 'Int64')
+            continue
+        except (TypeError, ValueError):
+            values = pd.to_numeric(text, errors='coerce')
+        invalid = (text.notna() & (values.isna() | (values % 1 != 0))).to_numpy()
+        flag(invalid, lambda i, column=column, text=text: f"{column} is not an integer: {text.iloc[i]!r}")
+        if default is None:  # Blank targets stay blank
+            roster[column] = values.where(~invalid).astype('Int64')
+        else:
+            roster[column] = values.where(~invalid & values.notna(), default).astype('int64')
+
+    check_states(flag, {column: roster[column].to_numpy() for column in ROSTER_DEFAULTS}, stars, known, table)
+    if targets:
+        check_states(flag, target_states(roster), stars, known, table, label='target ')
+    return roster_errors(roster, names, messages)
+
+
+def validate_targets(roster: pd.DataFrame, engine: Optional[cost_engine.CostEngine] = None,
+                     table: Optional[explmd.ExpLmdTable] = None) -> RosterChunk:
+    """Split a validated roster whose targets were set afterwards (e.g. ``planner.with_targets``) into rows
+    with valid targets and one error per row with a target out of range."""
+    engine = engine or cost_engine.get_engine()
+    table = table or explmd.get_table()
+    messages = dict()
+    stars = engine.stars[engine.indices(roster['name'])].astype(np.int64)
+    check_states(partial(flag_rows, messages, roster.index), target_states(roster), stars,
+                 np.ones(len(roster), dtype=bool), table, label='target ')
+    return roster_errors(roster, roster['name'], messages)
+
+
+def iter_roster(csv_path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, engine: Optional[cost_engine.CostEngine] = None,
+                table: Optional[explmd.ExpLmdTable] = None) -> Iterator[RosterChunk]:
+    """Validated chunks of a roster csv, ``chunk_rows`` rows at a time: memory is bounded by the chunk size,
+    whatever the size of the file. Invalid rows are left out of the chunks and reported with them."""
+    engine = engine or cost_engine.get_engine()
+    table = table or explmd.get_table()
+    with open(csv_path, mode="r", encoding="utf-8", newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        header = next(reader, None)
+        if header is None:
+            return
+        rows, lines, malformed = [], [], []
+
+        def chunk() -> RosterChunk:
+            raw = pd.DataFrame(rows, columns=header, index=lines, dtype=object).replace('', np.nan)
+            validated = validate_roster(raw, engine, table)
+            errors = sorted(validated.errors + malformed, key=lambda error: error.line)
+            rows.clear(), lines.clear(), malformed.clear()
+            return RosterChunk(roster=validated.roster, errors=errors)
+
+        for row in reader:
+            if not any(row):
+                continue  # Blank line
+            if len(row) > len(header):
+                malformed.append(RowError(line=reader.line_num, operator=row[0],
+                                          message=f"{len(row)} fields, the header has {len(header)}"))
+                continue
+            rows.append(row + [''] * (len(header) - len(row)))  # Missing trailing fields take the defaults
+            lines.append(reader.line_num)
+            if len(rows) == chunk_rows:
+                yield chunk()
+        if rows or malformed:
+            yield chunk()
+
+
+def read_roster(csv_path: str, engine: Optional[cost_engine.CostEngine] = None,
+                table: Optional[explmd.ExpLmdTable] = None) -> RosterChunk:
+    """The whole roster as one chunk, indexed by csv line like the chunks. Use ``iter_roster`` to bound the
+    memory instead."""
+    chunks = list(iter_roster(csv_path, engine=engine, table=table))
+    if not chunks:  # Header only, or no file content at all
+        return RosterChunk(roster=empty_roster(), errors=[])
+    roster = pd.concat([chunk.roster for chunk in chunks])
+    return RosterChunk(roster=roster, errors=[error for chunk in chunks for error in chunk.errors])
+
+
+def warn_errors(csv_path: str, errors: List[RowError]):
+    if not errors:
+        return
+    listed = '; '.join(str(error) for error in errors[:MAX_REPORTED_ERRORS])
+    more = f' and {len(errors) - MAX_REPORTED_ERRORS} more' if len(errors) > MAX_REPORTED_ERRORS else ''
+    warnings.warn(f"Skipping {len(errors)} invalid rows of {csv_path}: {listed}{more}")
+
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """Python's round(value, 2), which the Operator properties use, for a whole array."""
+    return np.array([round(value, 2) for value in values.tolist()], dtype=np.float64)
+
+
+def percentage(part: np.ndarray, whole: np.ndarray) -> np.ndarray:
+    return round2(part / whole * 100)
+
+
+def row_sums(ledger: pd.DataFrame, mask: np.ndarray, rows: int) -> np.ndarray:
+    """Quantity of the selected ledger entries summed per roster row."""
+    sums = np.bincount(ledger['row'].to_numpy()[mask], weights=ledger['quantity'].to_numpy()[mask], minlength=rows)
+    return sums.astype(np.int64)
+
+
+def pivot(rows: np.ndarray, resources: np.ndarray, quantities: np.ndarray, shape) -> np.ndarray:
+    """(row, resource) array of summed quantities of ledger entries."""
+    cells = rows.astype(np.int64) * shape[1] + resources
+    return np.bincount(cells, weights=quantities, minlength=shape[0] * shape[1]).astype(np.int64).reshape(shape)
+
+
+@dataclass(frozen=True)
+class RosterFrame:
+    info: pd.DataFrame  # One row per roster row, scalar metrics
+    ledger: pd.DataFrame  # CostEngine.ledger of the roster
+
+    def mask(self, metric: str) -> np.ndarray:
+        """Ledger entries making up one of RESOURCE_METRICS, as a boolean mask."""
+        quantity, track = RESOURCE_METRICS[metric]
+        mask = np.ones(len(self.ledger), dtype=bool)
+        if quantity != 'total':
+            mask &= self.ledger['spent'].to_numpy() == (quantity == 'spent')
+        if track is not None:
+            mask &= (self.ledger['track'] == track).to_numpy()
+        return mask
+
+    def entries(self, metric: str) -> pd.DataFrame:
+        """Ledger entries making up one of RESOURCE_METRICS."""
+        return self.ledger[self.mask(metric)]
+
+    def resources(self, metric: str) -> pd.DataFrame:
+        """(row, resource) quantities of one of RESOURCE_METRICS, indexed like ``info``.
+
+        Only resources with a non-zero quantity for some row get a column.
+        """
+        mask = self.mask(metric)
+        resources = self.ledger['resource'].cat.categories
+        table = pivot(self.ledger['row'].to_numpy()[mask], self.ledger['resource'].cat.codes.to_numpy()[mask],
+                      self.ledger['quantity'].to_numpy()[mask], (len(self.info), len(resources)))
+        used = table.any(axis=0)
+        return pd.DataFrame(table[:, used], index=self.info.index, columns=list(resources[used].astype(str)))
+
+
+def build_frame(roster: pd.DataFrame, engine: Optional[cost_engine.CostEngine] = None,
+                table: Optional[explmd.ExpLmdTable] = None) -> RosterFrame:
+    """Evaluate every roster row once."""
+    engine = engine or cost_engine.get_engine()
+    table = table or explmd.get_table()
+    operators = engine.indices(roster['name'])
+    ledger = engine.ledger(operators, engine.state_matrix(roster))
+    rows = len(operators)
+    materials = (ledger['resource'] != 'LMD').to_numpy()
+    spent = ledger['spent'].to_numpy()
+    total_materials = row_sums(ledger, materials, rows)
+    spent_materials = row_sums(ledger, materials & spent, rows)
+
+    stars = engine.stars[operators].astype(np.int64)
+    elite = roster['elite'].to_numpy(dtype=np.int64)
+    level = roster['level'].to_numpy(dtype=np.int64)
+
+    info = pd.DataFrame({
+        'operator': roster['name'].astype('string').reset_index(drop=True),
+        'stars': stars,
+        'elite': elite,
+        'level': level,
+        'skill_level': roster['skill_level'].to_numpy(dtype=np.int64),
+        's1_mastery': roster['s1_mastery'].to_numpy(dtype=np.int64),
+        's2_mastery': roster['s2_mastery'].to_numpy(dtype=np.int64),
+        's3_mastery': roster['s3_mastery'].to_numpy(dtype=np.int64),
+        'total_material_quantity': total_materials,
+        'spent_material_quantity': spent_materials,
+        'needed_material_quantity': total_materials - spent_materials,
+        'spent_elite_lmd': row_sums(ledger, ~materials & spent & (ledger['track'] == 'elite').to_numpy(), rows),
+        'total_lmd': table.total_lmd(stars),
+        'spent_lmd': table.lmd_at(stars, elite, level),
+        'total_yellow_exp': table.total_yellow_exp(stars),
+        'spent_yellow_exp': table.yellow_exp_at(stars, elite, level),
+    })
+    info['needed_lmd'] = info['total_lmd'] - info['spent_lmd']
+    info['needed_yellow_exp'] = info['total_yellow_exp'] - info['spent_yellow_exp']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        info['material_percentage'] = np.where(
+            total_materials == 0, 100.00, percentage(spent_materials, total_materials))
+    info['lmd_percentage'] = percentage(info['spent_lmd'].to_numpy(), info['total_lmd'].to_numpy())
+    info['yellow_exp_percentage'] = percentage(info['spent_yellow_exp'].to_numpy(),
+                                               info['total_yellow_exp'].to_numpy())
+    # Same summation order as Operator.overall_percentage
+    info['overall_percentage'] = round2(
+        (info['yellow_exp_percentage'] + info['lmd_percentage'] + info['material_percentage']).to_numpy() / 3)
+    return RosterFrame(info=info, ledger=ledger)
+
+
+def synthetic_roster(rows: int, engine: Optional[cost_engine.CostEngine] = None,
+                     table: Optional[explmd.ExpLmdTable] = None, seed: int = 0) -> pd.DataFrame:
+    """Random roster laid out like ``user_operators.csv``, every state reachable in game.
+
+    Elite and level stay within the rarity caps, skill levels 5 to 7 need E1, masteries need E2,
+    skill level 7 and at least 4 stars, and only skills with mastery costs are mastered. Used by the
+    benchmarks and the tests; columns missing from ``user_operators.csv`` take the ROSTER_DEFAULTS.
+    """
+    engine = engine or cost_engine.get_engine()
+    table = table or explmd.get_table()
+    rng = np.random.default_rng(seed)
+    operators = rng.integers(len(engine.operators), size=rows)
+    stars = engine.stars[operators].astype(np.int64)
+    elite = rng.integers(0, table.elite_cap[stars] + 1)
+    level = rng.integers(1, table.level_cap[stars, elite] + 1)
+    has_upgrades = engine.skill_table[:, -1].any(axis=-1)[operators]
+    skill_level = np.where(has_upgrades, rng.integers(1, np.where(elite >= 1, 7, 4) + 1), 1)
+    masterable = engine.mastery_table[:, :, -1].any(axis=-1)[operators]  # (row, skill)
+    can_master = (elite == 2) & (skill_level == 7) & (stars >= 4)
+    data = {
+        'name': np.asarray(engine.operators, dtype=object)[operators],
+        'stars': stars,
+        'elite': elite,
+        'level': level,
+        'skill_level': skill_level,
+    }
+    for skill in range(3):
+        data[f's{skill + 1}_mastery'] = np.where(can_master & masterable[:, skill], rng.integers(0, 4, size=rows), 0)
+    for column, default in ROSTER_DEFAULTS.items():
+        data.setdefault(column, np.full(rows, default, dtype=np.int64))
+    return pd.DataFrame(data)
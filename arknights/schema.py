@@ -0,0 +1,89 @@
+# encoding: utf-8
+"""Typed game data schema, shared by the scrapers and the calculator.
+
+Operator and resource JSON files, and the game data bundle, are decoded straight into these frozen
+structs by msgspec, which checks field names, types and ranges while decoding: game data is validated
+once, at load, and the engine reads plain attributes afterwards.
+"""
+from pathlib import Path
+from typing import Annotated, Dict, Tuple
+
+import msgspec
+from msgspec import Meta, Struct
+
+Level = Annotated[int, Meta(ge=1, le=7)]
+Quantity = Annotated[int, Meta(gt=0)]
+
+
+class Resource(Struct, frozen=True, forbid_unknown_fields=True, gc=False):
+    """Quantity of a resource, in an upgrade cost or a crafting recipe."""
+    name: str
+    quantity: Quantity
+
+
+class Upgrade(Struct, frozen=True, forbid_unknown_fields=True, gc=False):
+    """Resources of one elite promotion, skill level or mastery level."""
+    level: Level
+    resources: Tuple[Resource, ...] = ()
+
+
+class Mastery(Struct, frozen=True, forbid_unknown_fields=True, gc=False):
+    skill: Annotated[int, Meta(ge=1, le=5)]
+    upgrade: Tuple[Upgrade, ...] = ()
+
+
+class Skills(Struct, frozen=True, forbid_unknown_fields=True, gc=False):
+    upgrade: Tuple[Upgrade, ...] = ()
+    mastery: Tuple[Mastery, ...] = ()
+
+
+class Operator(Struct, frozen=True, forbid_unknown_fields=True, gc=False):
+    """``resources/operator/<n>stars/<name>.json``"""
+    name: str
+    stars: Annotated[int, Meta(ge=1, le=6)]
+    skills: Skills = Skills()
+    elite: Tuple[Upgrade, ...] = ()
+
+
+class ResourceData(Struct, frozen=True, forbid_unknown_fields=True, gc=False):
+    """``resources/resource/tier<n>/<name>.json``"""
+    name: str
+    tier: Annotated[int, Meta(ge=1, le=5)]
+    droppable: bool
+    lmd: Annotated[int, Meta(ge=0)]  # Workshop LMD per craft
+    recipe: Tuple[Resource, ...] = ()
+
+
+# EXP/LMD table of a rarity, as constants.load_exp_lmd_data returns it: 'elite_<n>' -> level -> column -> value
+ExpLmdData = Dict[str, Dict[int, Dict[str, int]]]
+
+
+class GameData(Struct, frozen=True, forbid_unknown_fields=True):
+    operators: Dict[str, Operator]
+    resources: Dict[str, ResourceData]
+    explmd: Dict[int, ExpLmdData] = {}  # By stars, only kept in the bundle
+
+
+operator_decoder = msgspec.json.Decoder(Operator)
+resource_decoder = msgspec.json.Decoder(ResourceData)
+
+
+def decode(decoder: msgspec.json.Decoder, path: Path):
+    """Decode and validate one JSON file, naming the file in validation errors."""
+    try:
+        return decoder.decode(path.read_bytes())
+    except msgspec.ValidationError as error:
+        raise msgspec.ValidationError(f"{path}: {error}") from None
+
+
+def read_operator(path: Path) -> Operator:
+    return decode(operator_decoder, path)
+
+
+def read_resource(path: Path) -> ResourceData:
+    return decode(resource_decoder, path)
+
+
+def to_json(value) -> dict:
+    """Plain ``dict``/``list`` form of a struct, as written to the game data JSON files."""
+    return msgspec.json.decode(msgspec.json.encode(value))
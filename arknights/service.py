@@ -0,0 +1,286 @@
+# encoding: utf-8
+"""Local HTTP query service, ``arknights-calc serve``.
+
+The cost engine, EXP/LMD tables and crafting recipes are loaded once at startup and kept in memory,
+so a query only pays for its own evaluation. Requests and responses are JSON; operator states use
+the ``user_operators.csv`` columns, missing ones take the roster defaults.
+
+Needed resources are counted up to each state's ``target``, the fully upgraded state when it is left
+out. As in ``planner``, fields left out of a target keep the current value and a target below the
+current state costs nothing on that track.
+
+    POST /operator   {"name": "Exusiai", "elite": 1, "level": 40, "target": {"elite": 2}}
+    POST /operators  {"operators": [{"name": ...}, ...]}   one result per operator state
+    POST /roster     {"operators": [...]}                  resources summed over the roster
+    POST /shortage   {"operators": [...], "inventory": {"Orirock": 120, ...}}
+    GET  /health
+"""
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from arknights import crafting as workshop
+from arknights import engine as cost_engine
+from arknights import explmd, reports
+from arknights import inventory as user_inventory
+from arknights.roster import ROSTER_DEFAULTS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY_SIZE = 16 * 1024 * 1024  # Bytes
+STATE_FIELDS = ['level'] + list(cost_engine.STATE_COLUMNS)
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class QueryError(ValueError):
+    """A request the calculator cannot answer, reported as a 400 response."""
+
+
+def state_columns(items: List[Mapping], defaults: Mapping[str, int]) -> Dict[str, np.ndarray]:
+    """Columns of a list of operator states, ``defaults`` filling missing fields."""
+    try:
+        return {column: np.array([int(item.get(column, defaults[column])) for item in items], dtype=np.int64)
+                for column in STATE_FIELDS}
+    except (TypeError, ValueError, AttributeError) as error:
+        raise QueryError(f"Invalid operator state: {error}") from None
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """Operator states evaluated against their targets, one row per state."""
+    operators: np.ndarray
+    stars: np.ndarray
+    elite: np.ndarray
+    level: np.ndarray
+    costs: cost_engine.RosterCosts  # Total and spent step costs
+    needed: np.ndarray  # (row, engine resource) step costs up to the target
+    needed_lmd: np.ndarray  # Leveling LMD up to the target
+    needed_yellow_exp: np.ndarray
+
+
+class Calculator:
+    """Query answers from game data kept in memory."""
+
+    def __init__(self, engine: Optional[cost_engine.CostEngine] = None, table: Optional[explmd.ExpLmdTable] = None,
+                 crafting: Optional[workshop.Crafting] = None):
+        self.engine = engine or cost_engine.get_engine()
+        self.table = table or explmd.get_table()
+        self.crafting = crafting or workshop.get_crafting()
+        self.operator_index = self.engine.operator_index
+        self.resource_index = {name: i for i, name in enumerate(self.crafting.resources)}
+        # Engine resource column -> crafting resource, to net roster needs against an inventory
+        self.engine_to_crafting = np.array([self.resource_index[name] for name in self.engine.resources])
+
+    def states(self, items) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """Operator indices, current and target state columns.
+
+        States without a ``target`` aim at the fully upgraded state, fields left out of a target keep
+        the current value.
+        """
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise QueryError("'operators' must be a list of operator objects")
+        try:
+            operators = np.array([self.operator_index[item['name']] for item in items], dtype=np.intp)
+        except (KeyError, TypeError) as error:
+            raise QueryError(f"Unknown operator: {error.args[0]!r}") from None
+        current = state_columns(items, ROSTER_DEFAULTS)
+        stars = self.engine.stars[operators].astype(np.int64)
+        max_elite, max_level = self.table.max_state(stars)
+        max_states = self.engine.max_states(operators)
+        target = {column: max_states[:, i] for i, column in enumerate(cost_engine.STATE_COLUMNS)}
+        target.update(elite=max_elite, level=max_level)
+        targets = [item.get('target') for item in items]
+        if any(item_target is not None for item_target in targets):
+            has_target = np.array([item_target is not None for item_target in targets])
+            requested = state_columns([item_target or dict() for item_target in targets],
+                                      dict.fromkeys(STATE_FIELDS, -1))
+            target = {column: np.where(requested[column] >= 0, requested[column],
+                                       np.where(has_target, current[column], target[column]))
+                      for column in STATE_FIELDS}
+        return operators, current, target
+
+    def evaluate(self, items) -> 'Evaluation':
+        operators, current, target = self.states(items)
+        engine, table = self.engine, self.table
+        stars = engine.stars[operators].astype(np.int64)
+        states = engine.state_matrix(dict(current, name=operators))
+        target_states = engine.state_matrix(dict(target, name=operators))
+        leveling = (stars, current['elite'], current['level'], target['elite'], target['level'])
+        return Evaluation(
+            operators=operators, stars=stars, elite=current['elite'], level=current['level'],
+            costs=engine.evaluate_states(operators, states),
+            # Clamped per track: a target below the current state must not offset the other tracks
+            needed=engine.cost_between(operators, states, np.maximum(states, target_states)),
+            needed_lmd=np.clip(table.lmd_between(*leveling), 0, None),
+            needed_yellow_exp=np.clip(table.yellow_exp_between(*leveling), 0, None),
+        )
+
+    def operators(self, items) -> List[dict]:
+        """Total, spent and needed (up to each state's target) resources of every operator state."""
+        result = self.evaluate(items)
+        costs = result.costs
+        totals, spent, needed = costs.to_dicts(costs.total), costs.to_dicts(costs.spent), costs.to_dicts(result.needed)
+        return [{
+            'name': self.engine.operators[operator],
+            'stars': int(result.stars[row]),
+            'total_resources': totals[row],
+            'spent_resources': spent[row],
+            'needed_resources': needed[row],
+            'needed_lmd': int(result.needed_lmd[row]),
+            'needed_yellow_exp': int(result.needed_yellow_exp[row]),
+        } for row, operator in enumerate(result.operators.tolist())]
+
+    def resource_sums(self, step_costs: np.ndarray, lmd: np.ndarray, yellow_exp: np.ndarray) -> np.ndarray:
+        """(row, engine resource) step costs plus leveling, summed over the rows into crafting resources."""
+        quantities = np.zeros(len(self.crafting.resources), dtype=np.int64)
+        np.add.at(quantities, self.engine_to_crafting, step_costs.sum(axis=0))
+        quantities[self.resource_index['LMD']] += lmd.sum()
+        quantities[self.resource_index[reports.YELLOW_EXP]] += yellow_exp.sum()
+        return quantities
+
+    def resource_table(self, columns: Dict[str, np.ndarray]) -> Dict[str, Dict[str, int]]:
+        """``{resource: {column: quantity}}`` of the resources non-zero in some column."""
+        names = self.crafting.resources
+        rows = np.flatnonzero(np.any([values != 0 for values in columns.values()], axis=0))
+        return {names[i]: {column: int(values[i]) for column, values in columns.items()} for i in rows}
+
+    def needed(self, items) -> np.ndarray:
+        """Roster-wide needed quantity of each crafting resource, leveling LMD and yellow EXP included."""
+        result = self.evaluate(items)
+        return self.resource_sums(result.needed, result.needed_lmd, result.needed_yellow_exp)
+
+    def roster(self, items) -> dict:
+        """Total, spent and needed resources summed over a roster, leveling LMD and yellow EXP included."""
+        result = self.evaluate(items)
+        stars, leveling, table = result.stars, (result.stars, result.elite, result.level), self.table
+        return {'operators': len(result.operators), 'resources': self.resource_table({
+            'total': self.resource_sums(result.costs.total, table.total_lmd(stars), table.total_yellow_exp(stars)),
+            'spent': self.resource_sums(result.costs.spent, table.lmd_at(*leveling), table.yellow_exp_at(*leveling)),
+            'needed': self.resource_sums(result.needed, result.needed_lmd, result.needed_yellow_exp),
+        })}
+
+    def shortage(self, items, held: Mapping[str, int]) -> dict:
+        """What a roster still needs against an inventory: held, used, crafted and still missing per resource."""
+        if not isinstance(held, dict):
+            raise QueryError("'inventory' must be an object of resource quantities")
+        inventory = np.zeros(len(self.crafting.resources), dtype=np.int64)
+        unknown = []
+        for name, quantity in held.items():
+            name = user_inventory.RESOURCE_ALIASES.get(name, name)
+            if name not in self.resource_index:
+                unknown.append(name)
+                continue
+            try:
+                inventory[self.resource_index[name]] += int(quantity)
+            except (TypeError, ValueError):
+                raise QueryError(f"Invalid quantity of {name}: {quantity!r}") from None
+        needed = self.needed(items)
+        plan = user_inventory.solve(needed, inventory, self.crafting)
+        return {
+            'resources': self.resource_table({'needed': needed, 'held': inventory, 'used': plan.used,
+                                              'crafts': plan.crafts, 'shortage': plan.shortage}),
+            'crafting_lmd': int(plan.lmd),
+            'unknown_resources': unknown,
+        }
+
+    def answer(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        """Status and JSON payload of a request."""
+        routes = {'/operator', '/operators', '/roster', '/shortage'}
+        if path == '/health':
+            return 200, {'status': 'ok', 'operators': len(self.engine.operators)}
+        if path not in routes:
+            return 404, {'error': f'No such endpoint: {path}'}
+        if method != 'POST':
+            return 405, {'error': f'{path} only answers POST requests'}
+        try:
+            query = json.loads(body or b'{}')
+            if not isinstance(query, dict):
+                raise QueryError("The request body must be a JSON object")
+            if path == '/operator':
+                return 200, self.operators([query])[0]
+            if path == '/operators':
+                return 200, {'results': self.operators(query.get('operators', []))}
+            if path == '/roster':
+                return 200, self.roster(query.get('operators', []))
+            return 200, self.shortage(query.get('operators', []), query.get('inventory', dict()))
+        except (json.JSONDecodeError, UnicodeDecodeError) as error:
+            return 400, {'error': f'Invalid JSON: {error}'}
+        except QueryError as error:
+            return 400, {'error': str(error)}
+
+
+def response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    headers = (f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+               f"Content-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n"
+               f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return headers.encode('latin-1') + body
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+    """Request line and headers, None once the client closed the connection."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, target, version = request_line.decode('latin-1').split()
+    headers = dict()
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    return method, target.split('?', 1)[0], version, headers
+
+
+class QueryServer:
+    """HTTP/1.1 server with keep-alive connections, answering every request from one Calculator."""
+
+    def __init__(self, calculator: Calculator):
+        self.calculator = calculator
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, version, headers = request
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_SIZE:
+                    writer.write(response(413, {'error': f'Bodies are limited to {MAX_BODY_SIZE} bytes'}, False))
+                    break
+                body = await reader.readexactly(length)
+                try:
+                    status, payload = self.calculator.answer(method, path, body)
+                except Exception as error:  # The service outlives a failing query
+                    status, payload = 500, {'error': f'{type(error).__name__}: {error}'}
+                writer.write(response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # Dropped connection or malformed request line, nothing left to answer
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on http://{host}:{port}. Press Ctrl+C to stop.")
+        async with server:
+            await server.serve_forever()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    calculator = Calculator()
+    calculator.operators([{'name': calculator.engine.operators[0]}])  # Warms up the first query
+    try:
+        asyncio.run(QueryServer(calculator).serve(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,52 @@
+# encoding: utf-8
+"""Polling file watcher with debouncing, used by ``arknights-calc watch``."""
+import os
+import time
+from typing import Callable, Dict, Mapping, Optional, Set, Tuple
+
+DEFAULT_INTERVAL = 0.2  # Seconds between polls
+DEFAULT_DEBOUNCE = 0.3  # Seconds a changed file must stay unchanged before it is reported
+
+FileState = Optional[Tuple[int, int]]  # (mtime_ns, size), None when the file does not exist
+
+
+def file_state(path: str) -> FileState:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot(paths) -> Dict[str, FileState]:
+    return {path: file_state(path) for path in paths}
+
+
+def changed_paths(before: Mapping[str, FileState], after: Mapping[str, FileState]) -> Set[str]:
+    return {path for path in after if after[path] != before.get(path)}
+
+
+def watch(paths, on_change: Callable[[Set[str]], None], interval: float = DEFAULT_INTERVAL,
+          debounce: float = DEFAULT_DEBOUNCE, should_stop: Callable[[], bool] = lambda: False):
+    """Call ``on_change`` with the paths changed since the previous call, once they stop changing.
+
+    Editors often save a file in several writes; a change is only reported after the files have been
+    stable for ``debounce`` seconds, so a burst of writes triggers a single call.
+    """
+    paths = list(dict.fromkeys(paths))
+    last = snapshot(paths)
+    while not should_stop():
+        time.sleep(interval)
+        current = snapshot(paths)
+        changed = changed_paths(last, current)
+        if not changed:
+            continue
+        while True:  # Wait for the burst of writes to settle
+            time.sleep(debounce)
+            settled = snapshot(paths)
+            if settled == current:
+                break
+            changed |= changed_paths(current, settled)
+            current = settled
+        last = current
+        on_change(changed)
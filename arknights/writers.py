@@ -0,0 +1,145 @@
+# encoding: utf-8
+"""Report writers.
+
+Excel workbooks are written either as styled Excel tables, which XlsxWriter keeps in memory, or
+streamed row by row in XlsxWriter's ``constant_memory`` mode. The same report tables can be written
+as CSV, Parquet or Arrow IPC files instead; the last two need ``pyarrow``.
+"""
+from typing import List
+
+import pandas as pd
+import xlsxwriter
+from pandas_xlsx_tables import df_to_xlsx_table
+
+# Rows converted to Python values at a time when streaming a workbook
+STREAM_CHUNK_ROWS = 10_000
+
+
+def text_width(values) -> int:
+    """Longest ``str()`` of a column, index or index level."""
+    return int(pd.Series(values, dtype=object).astype(str).str.len().max()) if len(values) else 0
+
+
+def column_widths(df: pd.DataFrame) -> List[int]:
+    """Width of each written column: the index levels then the columns, headers included."""
+    widths = []
+    for level, name in enumerate(df.index.names):
+        widths.append(max(text_width(df.index.get_level_values(level)), len(str(name))))
+    for column in df.columns:
+        widths.append(max(text_width(df[column]), len(str(column))))
+    return widths
+
+
+def save_as_xlsx(df, file_path):
+    col_widths = column_widths(df)
+    df = df.reset_index()
+
+    writer = pd.ExcelWriter(file_path, engine='xlsxwriter')
+    workbook = writer.book
+    worksheet = workbook.add_worksheet('Comparison')
+    writer.sheets['Comparison'] = worksheet
+    df.to_excel(writer, sheet_name='Comparison', startrow=0, startcol=0, index=False)
+
+    (max_row, max_col) = df.shape
+    totals_functions = {
+        'resource': None,
+        'percentage': 'average',
+        'total': None,
+        'spent': None,
+        'needed': None,
+        'tier': None,
+        'lmd': None,
+        'droppable': None
+    }
+    column_settings = [
+        {'header': column, 'total_function': totals_functions[column.lower()]} for column in df.columns
+    ]
+    options = {'columns': column_settings,
+               'style': 'Table Style Light 15',
+               'first_column': True,
+               'last_column': True,
+               'total_row': True}
+    worksheet.add_table(0, 0, max_row + 1, max_col - 1, options)
+
+    for i, width in enumerate(col_widths):
+        worksheet.set_column(i, i, width)
+    percent_fmt = workbook.add_format({'num_format': '0.00%'})
+    worksheet.set_column('H:H', None, percent_fmt)
+
+    # Close the Pandas Excel writer and output the Excel file.
+    writer.close()
+
+
+def save_as_xlsx_table(df, file_path, table_name):
+    if df.empty:  # pandas_xlsx_tables infers number formats from the first value, an empty table gets its header only
+        stream_xlsx(df, file_path, sheet_name=table_name)
+        return
+    df_to_xlsx_table(
+        df=df,
+        table_name=table_name,
+        file=file_path,
+        header_orientation="diagonal",
+        table_style="Table Style Light 9"
+    )
+
+
+def save_as_excel(df, file_path):
+    df.to_excel(file_path)
+
+
+def stream_xlsx(df: pd.DataFrame, file_path: str, sheet_name: str = 'Report'):
+    """Write a workbook in constant memory: rows are flushed to disk as they are written.
+
+    XlsxWriter cannot add Excel tables in this mode, the header gets an autofilter and is frozen instead.
+    """
+    widths = column_widths(df)
+    df = df.reset_index()
+    workbook = xlsxwriter.Workbook(file_path, {'constant_memory': True})
+    worksheet = workbook.add_worksheet(sheet_name)
+    for i, width in enumerate(widths):
+        worksheet.set_column(i, i, width)
+    worksheet.write_row(0, 0, [str(column) for column in df.columns], workbook.add_format({'bold': True}))
+    for start in range(0, len(df), STREAM_CHUNK_ROWS):
+        chunk = df.iloc[start:start + STREAM_CHUNK_ROWS].astype(object)
+        rows = chunk.where(chunk.notna(), None).to_numpy().tolist()  # NaN cells are left blank
+        for offset, row in enumerate(rows, start=start + 1):
+            worksheet.write_row(offset, 0, row)
+    worksheet.autofilter(0, 0, len(df), len(df.columns) - 1)
+    worksheet.freeze_panes(1, 0)
+    workbook.close()
+
+
+def save_as_csv(df: pd.DataFrame, file_path: str):
+    df.to_csv(file_path, sep=';', encoding='utf-8')
+
+
+def arrow_table(df: pd.DataFrame):
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError("Parquet and Arrow output need pyarrow: pip install pyarrow") from error
+    return pyarrow.Table.from_pandas(df)
+
+
+def save_as_parquet(df: pd.DataFrame, file_path: str):
+    table = arrow_table(df)
+    from pyarrow import parquet
+    parquet.write_table(table, file_path)
+
+
+def save_as_arrow(df: pd.DataFrame, file_path: str):
+    """Arrow IPC file format (Feather v2)."""
+    table = arrow_table(df)
+    from pyarrow import ipc
+    with ipc.new_file(file_path, table.schema) as writer:
+        writer.write_table(table)
+
+
+# Format -> (file extension, writer); 'xlsx' reports use their own styled writers
+FORMATS = {
+    'xlsx': ('.xlsx', None),
+    'xlsx-stream': ('.xlsx', stream_xlsx),
+    'csv': ('.csv', save_as_csv),
+    'parquet': ('.parquet', save_as_parquet),
+    'arrow': ('.arrow', save_as_arrow),
+}
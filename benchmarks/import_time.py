@@ -0,0 +1,39 @@
+# encoding: utf-8
+"""Import time budget of the calculator, run with `python benchmarks/import_time.py`.
+
+Exits with status 1 when a module takes longer to import than its budget.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+BUDGETS = {  # Seconds, best of REPEAT fresh interpreters
+    'arknights': 0.02,
+    'arknights.operator': 0.15,
+}
+REPEAT = 5
+SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def import_time(module: str) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        output = subprocess.run([sys.executable, '-c', SNIPPET.format(module=module)],
+                                cwd=ROOT_PATH, check=True, capture_output=True, text=True).stdout
+        timings.append(float(output))
+    return min(timings)
+
+
+def main() -> int:
+    failed = False
+    for module, budget in BUDGETS.items():
+        elapsed = import_time(module)
+        status = 'ok' if elapsed <= budget else 'OVER BUDGET'
+        failed |= elapsed > budget
+        print(f"import {module}: {elapsed * 1000:.1f} ms (budget {budget * 1000:.0f} ms) {status}")
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# encoding: utf-8
+"""Benchmark suite on synthetic rosters, run with `python benchmarks/suite.py`.
+
+Rosters of random operator states, within each operator's rarity limits, are generated at every
+size and the hot paths are timed on them: loading ``Operator`` objects, ``Operator.to_dict``, the
+roster frame aggregation and the main.py reports. Timings are compared with ``baseline.json`` and
+the run exits with status 1 when a case is slower than its baseline by more than the threshold.
+
+    python benchmarks/suite.py                        # compare with the baseline
+    python benchmarks/suite.py --update               # record the baseline of this machine
+    python benchmarks/suite.py --sizes 1000000 --catalog-scale 10
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, Optional
+
+import msgspec
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_PATH))
+
+from arknights import catalog, cli, engine as cost_engine, explmd, operator, roster  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_THRESHOLD = 0.25  # Allowed slowdown over the baseline
+NOISE_FLOOR = 0.005  # Seconds, slowdowns below it are never regressions
+REPEAT = 3  # Best of
+
+
+def synthetic_catalog(copies: int) -> catalog.Catalog:
+    """Game catalog with ``copies`` renamed copies of every operator."""
+    game_catalog = catalog.get_catalog()
+    operators = dict()
+    for copy in range(copies):
+        for name, data in game_catalog.operators.items():
+            copy_name = name if copy == 0 else f'{name} #{copy}'
+            operators[copy_name] = msgspec.structs.replace(data, name=copy_name)
+    return catalog.Catalog(operators=MappingProxyType(operators), resources=game_catalog.resources)
+
+
+class Workload:
+    """One synthetic roster and whatever the cases derive from it, built outside of the timings."""
+
+    def __init__(self, rows: int, engine: cost_engine.CostEngine, table: explmd.ExpLmdTable, directory: Path):
+        self.rows = rows
+        self.engine = engine
+        self.table = table
+        self.directory = directory
+        self.roster = roster.synthetic_roster(rows, engine, table)
+        self.csv_path = directory / f'roster-{rows}.csv'
+        self.roster.to_csv(self.csv_path, sep=';', index=False)
+        self._operators = None
+        self._frame = None
+        self._df_resources = None
+
+    @property
+    def operators(self):
+        if self._operators is None:
+            self._operators = operator.load_operators(str(self.csv_path))
+        return self._operators
+
+    @property
+    def frame(self) -> roster.RosterFrame:
+        if self._frame is None:
+            self._frame = roster.build_frame(self.roster, engine=self.engine, table=self.table)
+        return self._frame
+
+    @property
+    def df_resources(self):
+        if self._df_resources is None:
+            self._df_resources = cli.ReportData(operators_path=str(self.csv_path)).df_resources
+        return self._df_resources
+
+    @property
+    def report_data(self) -> cli.ReportData:
+        """Fresh report data, nothing a report builds (e.g. ``totals``) is cached yet."""
+        data = cli.ReportData(operators_path=str(self.csv_path))
+        # Seeds the cached properties, reports are timed without the aggregation and the game data loading
+        data.frame, data.df_resources = self.frame, self.df_resources
+        return data
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[Workload], Callable[[], object]]  # Returns the timed function
+    max_rows: Optional[int] = None  # Larger rosters are skipped
+    game_catalog_only: bool = False  # Uses the process-wide catalog, skipped on synthetic catalogs
+
+
+def report_table(name: str) -> Callable[[Workload], Callable[[], object]]:
+    def setup(workload: Workload):
+        workload.frame, workload.df_resources  # Built outside the timings
+        # One ReportData per run, a table cached by the first run (e.g. totals) would be timed warm otherwise
+        return lambda: cli.REPORTS[name][1](workload.report_data)
+    return setup
+
+
+def report_write(name: str) -> Callable[[Workload], Callable[[], object]]:
+    def setup(workload: Workload):
+        file_name, build, write = cli.REPORTS[name]
+        table = build(workload.report_data)
+        path = str(workload.directory / f'{file_name}.xlsx')
+        return lambda: write(table, path)
+    return setup
+
+
+def operators_to_dict(workload: Workload):
+    operators = workload.operators
+    # Fresh objects every run, the cost cache of each Operator would otherwise be timed warm
+    states = [dict(name=op.name, level=op.level, elite_level=op.elite_level, skill_level=op.skill_level,
+                   s1_mastery=op.s1_mastery, s2_mastery=op.s2_mastery, s3_mastery=op.s3_mastery) for op in operators]
+    return lambda: [operator.Operator(**state).to_dict() for state in states]
+
+
+CASES = [
+    Case('load_operators', lambda w: lambda: operator.load_operators(str(w.csv_path)), max_rows=100_000,
+         game_catalog_only=True),
+    Case('Operator.to_dict', operators_to_dict, max_rows=10_000, game_catalog_only=True),
+    Case('build_frame', lambda w: lambda: roster.build_frame(w.roster, engine=w.engine, table=w.table)),
+] + [
+    Case(f'report_table:{name}', report_table(name)) for name in ('needed', 'spent', 'total')
+] + [
+    Case(f'report_write:{name}', report_write(name), max_rows=10_000) for name in ('needed', 'spent', 'total')
+]
+
+
+def best_time(function: Callable[[], object], repeat: int = REPEAT) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sizes, catalog_scale: int = 1, repeat: int = REPEAT) -> Dict[str, Dict[str, float]]:
+    """Seconds per case and roster size, ``{case: {rows: seconds}}``."""
+    game_catalog = catalog.get_catalog() if catalog_scale == 1 else synthetic_catalog(catalog_scale)
+    engine = cost_engine.CostEngine.compile(game_catalog)
+    table = explmd.get_table()
+    results: Dict[str, Dict[str, float]] = {case.name: dict() for case in CASES}
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            workload = Workload(rows, engine, table, Path(directory))
+            for case in CASES:
+                if (case.max_rows is not None and rows > case.max_rows) or (case.game_catalog_only
+                                                                             and catalog_scale != 1):
+                    continue
+                results[case.name][str(rows)] = best_time(case.setup(workload), repeat)
+    return results
+
+
+def suite_key(catalog_scale: int) -> str:
+    return 'game-catalog' if catalog_scale == 1 else f'catalog-x{catalog_scale}'
+
+
+def compare(results, baseline, threshold: float) -> int:
+    """Print every timing next to its baseline, returning the number of regressions."""
+    regressions = 0
+    for case, timings in results.items():
+        for rows, elapsed in timings.items():
+            base = baseline.get(case, dict()).get(rows)
+            if base is None:
+                print(f"{case:>32} {int(rows):>9,} rows: {elapsed * 1000:10.1f} ms  (no baseline)")
+                continue
+            regressed = elapsed > base * (1 + threshold) and elapsed - base > NOISE_FLOOR
+            regressions += regressed
+            print(f"{case:>32} {int(rows):>9,} rows: {elapsed * 1000:10.1f} ms  baseline {base * 1000:10.1f} ms  "
+                  f"{elapsed / base - 1:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the calculator on synthetic rosters.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f"Roster rows to benchmark (default: {' '.join(map(str, DEFAULT_SIZES))}).")
+    parser.add_argument('--catalog-scale', type=int, default=1,
+                        help='Benchmark on a synthetic catalog with this many copies of every operator.')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help=f'Runs per timing, best kept (default: {REPEAT}).')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed slowdown over the baseline (default: {DEFAULT_THRESHOLD}).')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help='Baseline JSON file.')
+    parser.add_argument('--update', action='store_true', help='Store these timings as the baseline.')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, catalog_scale=args.catalog_scale, repeat=args.repeat)
+    stored = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.is_file() else dict()
+    key = suite_key(args.catalog_scale)
+    regressions = compare(results, stored.get(key, dict()), args.threshold)
+    if args.update:
+        suite = stored.setdefault(key, dict())
+        for case, timings in results.items():
+            suite.setdefault(case, dict()).update(timings)
+        stored['machine'] = {'python': platform.python_version(), 'platform': platform.platform(),
+                             'processor': platform.processor() or platform.machine()}
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"Baseline saved at {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return int(regressions > 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 # encoding: utf-8
+import sys
 from pathlib import Path
 
 from selenium.webdriver import Chrome
@@ -13,6 +14,10 @@ import csv
 from selenium.webdriver.chrome.service import Service
 # import ruamel.yaml
 import json
+import msgspec
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from arknights import schema  # noqa: E402
 
 
 def get_materials(soup):
@@ -32,8 +37,8 @@ def get_elite_resources(stars):
         return resources
 
     wait = WebDriverWait(driver, delay)
-    elite1_resources = dict()
-    elite2_resources = dict()
+    elite1_resources = []
+    elite2_resources = []
     if stars >= 3:
         retry, max_retries = 0, 3
         while retry <= max_retries:
@@ -161,6 +166,8 @@ if __name__ == "__main__":
                     "skills": skills,
                     "elite": elite
                 }
+                # Same schema the calculator loads with, a bad scrape fails here instead of at load
+                operator_data = schema.to_json(msgspec.convert(operator_data, schema.Operator))
                 op_path = f'{json_path}/{stars}stars/{name}.json'
                 Path(op_path).parent.mkdir(parents=True, exist_ok=True)
                 with open(op_path, 'w+', encoding='utf-8') as f:
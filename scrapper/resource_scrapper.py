@@ -1,10 +1,15 @@
 # encoding: utf-8
+import sys
 from pathlib import Path
 
+import msgspec
 import pandas as pd
 import json
 import urllib.request
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from arknights import schema  # noqa: E402
+
 json_path = '../files/resources'
 lmd_by_tier = {5: 400, 4: 300, 3: 200, 2: 100, 1: 0}
 
@@ -33,6 +38,8 @@ for resource in df.to_dict('records'):
     path = f"{json_path}/tier{resource['tier']}/{resource['name']}.json"
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     print(f"Writing Resources data: {resource['name']}.")
+    # Same schema the calculator loads with, a bad scrape fails here instead of at load
+    resource = schema.to_json(msgspec.convert(resource, schema.ResourceData))
     with open(path, 'w+', encoding='utf-8') as f:
         json.dump(resource, f, indent=4)
 
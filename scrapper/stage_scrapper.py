@@ -0,0 +1,41 @@
+# encoding: utf-8
+import csv
+import json
+import urllib.request
+
+csv_path = '../arknights/resources/stages.csv'
+penguin_stats_api = 'https://penguin-stats.io/PenguinStats/api/v2'
+server = 'US'
+stage_types = {'MAIN', 'SUB', 'DAILY'}  # Permanently open stages only
+min_samples = 100
+
+
+def get_json(endpoint: str):
+    with urllib.request.urlopen(f"{penguin_stats_api}/{endpoint}") as url:
+        return json.loads(url.read().decode())
+
+
+items = {item['itemId']: item['name_i18n'].get('en', item['name']) for item in get_json('items')}
+stages = {stage['stageId']: stage for stage in get_json(f'stages?server={server}')
+          if stage.get('stageType') in stage_types and stage.get('apCost')}
+matrix = get_json(f'result/matrix?server={server}')['matrix']
+
+rows = []
+for drop in matrix:
+    stage = stages.get(drop['stageId'])
+    if stage is None or drop['itemId'] not in items or drop['times'] < min_samples or drop['quantity'] == 0:
+        continue
+    rows.append({
+        'stage': stage['code'],
+        'sanity': stage['apCost'],
+        'resource': items[drop['itemId']],
+        'drop_rate': round(drop['quantity'] / drop['times'], 6)
+    })
+
+print(f"Writing {len(rows)} drops of {len({row['stage'] for row in rows})} stages.")
+with open(csv_path, 'w+', encoding='utf-8', newline='') as f:
+    writer = csv.DictWriter(f, fieldnames=['stage', 'sanity', 'resource', 'drop_rate'], delimiter=';')
+    writer.writeheader()
+    writer.writerows(sorted(rows, key=lambda row: (row['stage'], row['resource'])))
+
+print("Done.")
@@ -7,5 +7,11 @@ setup(
     author='MaxEhrhart',
     author_email='',
     packages=['arknights'],  # same as name
-    install_requires=['numpy==1.21.4', 'pandas==1.3.4', 'XlsxWriter==3.0.2', 'pandas-xlsx-tables==0.0.5']  # dependency
+    python_requires='>=3.10',  # Slotted dataclasses
+    install_requires=[  # dependency
+        'numpy==1.21.4', 'pandas==1.3.4', 'XlsxWriter==3.0.2', 'pandas-xlsx-tables==0.0.5', 'scipy==1.7.3',
+        'pytz', 'msgspec>=0.18'
+    ],
+    extras_require={'columnar': ['pyarrow']},  # Parquet and Arrow report output
+    entry_points={'console_scripts': ['arknights-calc=arknights.cli:main']}
 )
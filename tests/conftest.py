@@ -0,0 +1,27 @@
+# encoding: utf-8
+import numpy as np
+import pytest
+
+from arknights import crafting as workshop
+from arknights import engine as cost_engine
+
+
+@pytest.fixture(scope='session')
+def engine():
+    return cost_engine.get_engine()
+
+
+@pytest.fixture(scope='session')
+def crafting():
+    return workshop.get_crafting()
+
+
+@pytest.fixture(scope='session')
+def quantities(crafting):
+    """Vector aligned with the crafting resources, ``quantities(Orirock_Cube=2)``."""
+    def build(**named):
+        values = np.zeros(len(crafting.resources), dtype=np.int64)
+        for name, quantity in named.items():
+            values[crafting.resources.index(name.replace('_', ' '))] = quantity
+        return values
+    return build
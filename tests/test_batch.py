@@ -0,0 +1,63 @@
+# encoding: utf-8
+from functools import lru_cache
+
+from arknights import batch, catalog, cli
+from arknights import crafting as workshop
+
+HEADER = 'name;stars;elite;level;skill_level;s1_mastery;s2_mastery;s3_mastery\n'
+
+
+def test_report_on_a_header_only_roster(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_text(HEADER, encoding='utf-8')
+    output_dir = tmp_path / 'reports'
+    cli.main(['report', 'needed', 'spent', 'total', 'by-operator', '--operators', str(path), '--no-cache',
+              '-o', str(output_dir)])
+    assert len(list(output_dir.glob('*.xlsx'))) == 4
+
+
+def test_batch_on_a_header_only_roster(tmp_path):
+    accounts = tmp_path / 'accounts'
+    accounts.mkdir()
+    (accounts / 'empty.csv').write_text(HEADER, encoding='utf-8')
+    (accounts / 'one.csv').write_text(HEADER + 'Exusiai;6;2;90;7;0;0;3\n', encoding='utf-8')
+    results = batch.run_batch(str(accounts), ['needed', 'total'], output_dir=str(tmp_path / 'reports'), jobs=1)
+    summaries = {result.account.name: result for result in results}
+    assert summaries['empty'].error is None
+    assert summaries['empty'].summary['operators'] == 0
+    assert summaries['one'].summary['operators'] == 1
+    assert len(list((tmp_path / 'reports' / 'empty').glob('*.xlsx'))) == 2
+
+
+def test_batch_survives_a_failing_report(tmp_path, monkeypatch):
+    accounts = tmp_path / 'accounts'
+    accounts.mkdir()
+    (accounts / 'one.csv').write_text(HEADER + 'Exusiai;6;2;90;7;0;0;3\n', encoding='utf-8')
+    (accounts / 'two.csv').write_text(HEADER + 'Fang;3;1;55;7;0;0;0\n', encoding='utf-8')
+    run_reports = cli.run_reports
+
+    def failing(names, data, **kwargs):
+        if data.operators_path.endswith('one.csv'):
+            raise RuntimeError('disk full')
+        return run_reports(names, data, **kwargs)
+
+    monkeypatch.setattr(cli, 'run_reports', failing)
+    results = batch.run_batch(str(accounts), ['needed'], output_dir=str(tmp_path / 'reports'), jobs=1)
+    assert [(result.account.name, result.error) for result in results] == [('one', 'RuntimeError: disk full'),
+                                                                           ('two', None)]
+
+
+def test_workers_do_not_load_the_catalog(tmp_path, monkeypatch):
+    roster_path = tmp_path / 'one.csv'
+    roster_path.write_text(HEADER + 'Exusiai;6;2;90;7;0;0;3\n', encoding='utf-8')
+    batch.GameData.share(tmp_path / 'shared')
+    monkeypatch.setattr(catalog, 'get_catalog', lru_cache(maxsize=None)(catalog.get_catalog.__wrapped__))
+    monkeypatch.setattr(workshop, 'get_crafting', lru_cache(maxsize=None)(workshop.get_crafting.__wrapped__))
+    batch.init_worker(str(tmp_path / 'shared'))
+    try:
+        result = batch.run_account(batch.Account(name='one', path=str(roster_path)), cli.ROSTER_REPORTS,
+                                   output_dir=str(tmp_path / 'reports'), file_format='xlsx')
+    finally:
+        batch._game_data = None
+    assert result.error is None
+    assert catalog.get_catalog.cache_info().currsize == 0
@@ -0,0 +1,49 @@
+# encoding: utf-8
+import struct
+
+import pytest
+
+from arknights import bundle
+
+
+@pytest.fixture(scope='module')
+def built(tmp_path_factory):
+    path = tmp_path_factory.mktemp('bundle') / 'bundle.bin'
+    bundle.build(str(path))
+    return path
+
+
+def test_load_a_built_bundle(built):
+    game_data = bundle.load(str(built))
+    assert game_data.operators.keys() == bundle.read_operators_json().keys()
+
+
+@pytest.mark.parametrize('size', [0, 5, bundle.HEADER.size - 1])
+def test_load_ignores_truncated_bundles(built, tmp_path, size):
+    path = tmp_path / 'bundle.bin'
+    path.write_bytes(built.read_bytes()[:size])
+    with pytest.warns(UserWarning, match='truncated'):
+        assert bundle.load(str(path)) is None
+
+
+def test_load_ignores_other_versions(built, tmp_path):
+    path = tmp_path / 'bundle.bin'
+    path.write_bytes(struct.pack('<4sH', bundle.BUNDLE_MAGIC, 2) + built.read_bytes()[bundle.HEADER.size:])
+    with pytest.warns(UserWarning, match='expected bundle version'):
+        assert bundle.load(str(path)) is None
+
+
+def test_load_ignores_bundles_older_than_the_sources(built, tmp_path, monkeypatch):
+    rescraped = tmp_path / 'Exusiai.json'
+    rescraped.write_text('{}', encoding='utf-8')
+    sources = bundle.source_files()
+    monkeypatch.setattr(bundle, 'source_files', lambda: sources + [rescraped])
+    with pytest.warns(UserWarning, match='source data files changed'):
+        assert bundle.load(str(built)) is None
+
+
+def test_load_ignores_unreadable_payloads(built, tmp_path):
+    path = tmp_path / 'bundle.bin'
+    path.write_bytes(built.read_bytes()[:bundle.HEADER.size] + b'\xc1 not msgpack')
+    with pytest.warns(UserWarning, match='unreadable'):
+        assert bundle.load(str(path)) is None
@@ -0,0 +1,69 @@
+# encoding: utf-8
+import pickle
+
+import pandas as pd
+import pytest
+
+from arknights import cache, roster
+
+
+@pytest.fixture(scope='module')
+def user_roster(engine):
+    return roster.synthetic_roster(200, engine, seed=19)
+
+
+def assert_same_frame(frame, expected):
+    pd.testing.assert_frame_equal(frame.info, expected.info)
+    pd.testing.assert_frame_equal(frame.ledger, expected.ledger)
+
+
+def test_update_without_stored_results(user_roster):
+    frame, stored = cache.update(None, user_roster)
+    assert_same_frame(frame, roster.build_frame(user_roster))
+    assert len(stored.keys) == len(set(cache.row_keys(user_roster)))
+
+
+def test_update_evaluates_changed_rows(user_roster):
+    _, stored = cache.update(None, user_roster)
+    changed = user_roster.copy()
+    changed.loc[3, ['elite', 'level', 's1_mastery', 's2_mastery', 's3_mastery']] = [0, 1, 0, 0, 0]
+    changed.loc[7, 'skill_level'] = 1
+    # Duplicated and reordered rows, plus rows dropped
+    changed = pd.concat([changed.iloc[10:], changed.iloc[:5]], ignore_index=True)
+    changed = changed.sample(frac=1, random_state=0).reset_index(drop=True)
+    frame, kept = cache.update(stored, changed)
+    assert_same_frame(frame, roster.build_frame(changed))
+    assert set(kept.keys) == set(cache.row_keys(changed))
+
+
+def test_update_keeps_stored_results_when_nothing_changed(user_roster):
+    _, stored = cache.update(None, user_roster)
+    frame, kept = cache.update(stored, user_roster)
+    assert kept is stored
+    assert_same_frame(frame, roster.build_frame(user_roster))
+
+
+def test_build_frame_round_trips_the_cache_file(user_roster, tmp_path):
+    path = str(tmp_path / 'roster.cache')
+    first = cache.build_frame(user_roster, path)
+    assert cache.load(path) is not None
+    assert_same_frame(cache.build_frame(user_roster, path), first)
+    (tmp_path / 'roster.cache').write_bytes(b'not a cache')
+    with pytest.warns(UserWarning, match='not a roster cache'):
+        assert cache.load(path) is None
+
+
+@pytest.mark.parametrize('payload', [b'', b'\x80\x05garbage', pickle.dumps({'keys': []})])
+def test_load_ignores_unreadable_caches(tmp_path, payload):
+    path = tmp_path / 'roster.cache'
+    path.write_bytes(cache.HEADER.pack(cache.CACHE_MAGIC, cache.CACHE_VERSION) + payload)
+    with pytest.warns(UserWarning, match='Ignoring'):
+        assert cache.load(str(path)) is None
+
+
+def test_load_ignores_caches_of_an_older_layout(tmp_path, user_roster, monkeypatch):
+    path = str(tmp_path / 'roster.cache')
+    cache.build_frame(user_roster, path)
+    monkeypatch.delattr(cache, 'RosterCache')  # Class renamed or moved since the cache was written
+    with pytest.warns(UserWarning, match='unreadable'):
+        assert cache.load(path) is None
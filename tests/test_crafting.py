@@ -0,0 +1,55 @@
+# encoding: utf-8
+import numpy as np
+import pytest
+
+from arknights import crafting as workshop
+
+
+def expanded(crafting, quantities, min_tier=1):
+    ingredients, lmd = crafting.expand(quantities, min_tier=min_tier)
+    return crafting_dict(crafting, ingredients), int(lmd)
+
+
+def crafting_dict(crafting, quantities):
+    return {crafting.resources[i]: int(quantities[i]) for i in np.flatnonzero(quantities)}
+
+
+def test_expand_to_base_materials(crafting, quantities):
+    # 1 concentration (300 LMD) = 4 clusters (4 x 200) = 20 cubes (20 x 100) = 60 orirock
+    assert expanded(crafting, quantities(Orirock_Concentration=1)) == ({'Orirock': 60}, 3100)
+    assert expanded(crafting, quantities(Orirock_Concentration=2, Orirock=5)) == ({'Orirock': 125}, 6200)
+
+
+def test_expand_stops_below_min_tier(crafting, quantities):
+    assert expanded(crafting, quantities(Orirock_Concentration=1), min_tier=5) == ({'Orirock Concentration': 1}, 0)
+    assert expanded(crafting, quantities(Orirock_Concentration=1), min_tier=3) == ({'Orirock Cube': 20}, 1100)
+    assert expanded(crafting, quantities(Polymerization_Preparation=1), min_tier=5) == (
+        {'Keton Colloid': 1, 'Orirock Concentration': 1, 'Oriron Block': 1}, 400)
+
+
+def test_expand_rows(crafting, quantities):
+    rows = np.stack([quantities(Orirock_Cluster=1), quantities(Orirock_Cube=2), quantities(LMD=7)])
+    ingredients, lmd = crafting.expand(rows)
+    assert [crafting_dict(crafting, row) for row in ingredients] == [{'Orirock': 15}, {'Orirock': 6}, {'LMD': 7}]
+    assert lmd.tolist() == [700, 200, 0]
+
+
+def test_closure_is_computed_once_per_tier(crafting):
+    matrix, lmd = crafting.closure(min_tier=1)
+    assert crafting.closure(min_tier=1)[0] is matrix
+    base = ~crafting.craftable
+    assert (matrix[base] == np.eye(len(crafting.resources), dtype=np.int64)[base]).all()
+    assert not lmd[base].any()
+
+
+def test_save_and_load(crafting, quantities, tmp_path):
+    loaded = workshop.Crafting.load(crafting.save(tmp_path / 'crafting'))
+    assert loaded.resources == crafting.resources
+    assert (loaded.order == crafting.order).all()
+    assert expanded(loaded, quantities(Orirock_Concentration=1)) == ({'Orirock': 60}, 3100)
+
+
+def test_recipe_cycles_are_refused():
+    recipes = np.array([[0, 1], [1, 0]])
+    with pytest.raises(ValueError, match='cycle'):
+        workshop.topological_order(recipes)
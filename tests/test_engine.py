@@ -0,0 +1,80 @@
+# encoding: utf-8
+import numpy as np
+import pytest
+
+from arknights import engine as cost_engine
+from arknights import roster
+from arknights.operator import Operator
+
+ROWS = 300
+
+
+@pytest.fixture(scope='module')
+def user_roster(engine):
+    return roster.synthetic_roster(ROWS, engine, seed=4)
+
+
+@pytest.fixture(scope='module')
+def operators(user_roster):
+    return [Operator(name=row.name, level=row.level, elite_level=row.elite, skill_level=row.skill_level,
+                     s1_mastery=row.s1_mastery, s2_mastery=row.s2_mastery, s3_mastery=row.s3_mastery)
+            for row in user_roster.itertuples(index=False)]
+
+
+def test_build_frame_matches_operator_metrics(user_roster, operators):
+    frame = roster.build_frame(user_roster)
+    expected = [operator.to_dict() for operator in operators]
+    for column in frame.info.columns.drop('operator'):
+        assert frame.info[column].tolist() == [attributes[column] for attributes in expected], column
+    for metric in roster.RESOURCE_METRICS:
+        table = frame.resources(metric)
+        rows = [{resource: int(quantity) for resource, quantity in row.items() if quantity}
+                for row in table.to_dict(orient='records')]
+        assert rows == [attributes[metric] for attributes in expected], metric
+
+
+def test_evaluate_matches_operator_resources(engine, user_roster, operators):
+    costs = engine.evaluate(user_roster)
+    assert costs.to_dicts(costs.total) == [operator.total_resources for operator in operators]
+    assert costs.to_dicts(costs.spent) == [operator.spent_resources for operator in operators]
+    assert costs.to_dicts(costs.needed) == [operator.needed_resources for operator in operators]
+    assert costs.to_dicts(costs.track_needed('mastery')) == [operator.needed_mastery_resources
+                                                             for operator in operators]
+
+
+def test_ledger_sums_to_evaluate(engine, user_roster):
+    operators, states = engine.indices(user_roster['name']), engine.state_matrix(user_roster)
+    costs = engine.evaluate_states(operators, states)
+    ledger = engine.ledger(operators, states)
+    for spent, expected in ((True, costs.spent), (False, costs.needed)):
+        entries = ledger[ledger['spent'] == spent]
+        summed = np.zeros_like(expected)
+        np.add.at(summed, (entries['row'].to_numpy(), entries['resource'].cat.codes.to_numpy()),
+                  entries['quantity'].to_numpy())
+        assert (summed == expected).all()
+
+
+def test_cost_between_is_the_difference_of_cost_to(engine, user_roster):
+    operators, states = engine.indices(user_roster['name']), engine.state_matrix(user_roster)
+    max_states = engine.max_states(operators)
+    needed = engine.cost_between(operators, states, max_states)
+    assert (needed == engine.evaluate_states(operators, states).needed).all()
+    assert (engine.cost_between(operators, states, states) == 0).all()
+
+
+def test_cost_vector_is_cached_until_the_state_changes(engine):
+    operator = Operator(name='Exusiai', level=1, elite_level=0, skill_level=1)
+    spent = operator.spent_resources
+    operator.elite_level, operator.level = 2, 1
+    operator.skill_level = 7
+    assert operator.spent_resources != spent
+    operator.spent_resources['LMD'] = -1  # Callers get a copy
+    assert operator.spent_resources.get('LMD') != -1
+    costs = engine.evaluate({'name': ['Exusiai'], 'elite': [2], 'level': [1], 'skill_level': [7]})
+    assert costs.to_dicts(costs.spent) == [operator.spent_resources]
+
+
+def test_code_dtype_fits_every_category():
+    assert cost_engine.code_dtype(100) == np.int8
+    assert cost_engine.code_dtype(200) == np.int16
+    assert cost_engine.code_dtype(40_000) == np.int32
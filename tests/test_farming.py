@@ -0,0 +1,44 @@
+# encoding: utf-8
+from pathlib import Path
+
+import pytest
+
+from arknights import farming
+
+STAGES_PATH = Path(__file__).resolve().parent / 'data' / 'stages.csv'
+
+
+@pytest.fixture(scope='module')
+def stage_table(crafting):
+    return farming.load_stages(crafting.resources, str(STAGES_PATH))
+
+
+def test_load_stages(crafting, stage_table):
+    assert stage_table.stages == ('CUBE-1', 'CUBE-2', 'CLUSTER-1')
+    assert stage_table.sanity.tolist() == [6, 9, 18]
+    assert stage_table.drops[1, crafting.resources.index('Orirock Cube')] == 2.0
+
+
+def test_optimize_crafts_from_the_cheapest_drops(crafting, stage_table, quantities):
+    # A cluster is 5 cubes: 22.5 sanity from CUBE-2 against 36 from CLUSTER-1
+    plan = farming.optimize(quantities(Orirock_Cluster=2), stage_table=stage_table, crafting=crafting)
+    assert plan.stage_runs() == {'CUBE-2': 5}
+    assert plan.resource_crafts() == {'Orirock Cluster': 2}
+    assert plan.sanity == pytest.approx(45)
+    assert plan.lmd == pytest.approx(400)
+    assert not plan.uncovered.any()
+
+
+def test_optimize_uses_the_inventory(crafting, stage_table, quantities):
+    plan = farming.optimize(quantities(Orirock_Cube=10), quantities(Orirock_Cube=4),
+                            stage_table=stage_table, crafting=crafting)
+    assert plan.stage_runs() == {'CUBE-2': 3}
+    assert plan.sanity == pytest.approx(27)
+
+
+def test_optimize_reports_what_cannot_be_obtained(crafting, stage_table, quantities):
+    plan = farming.optimize(quantities(Orirock_Cube=2, Polymerization_Preparation=3),
+                            quantities(Polymerization_Preparation=1), stage_table=stage_table,
+                            crafting=crafting)
+    assert plan.stage_runs() == {'CUBE-2': 1}
+    assert plan.uncovered[crafting.resources.index('Polymerization Preparation')] == 2
@@ -0,0 +1,43 @@
+# encoding: utf-8
+import numpy as np
+import pytest
+
+from arknights import inventory
+
+
+def test_inventory_covers_the_need(crafting, quantities):
+    plan = inventory.solve(quantities(Orirock_Cube=4), quantities(Orirock_Cube=10), crafting)
+    assert plan.to_dict(plan.shortage) == {}
+    assert plan.to_dict(plan.used) == {'Orirock Cube': 4}
+    assert plan.to_dict(plan.crafts) == {}
+    assert plan.lmd == 0
+
+
+def test_missing_products_are_crafted_from_held_ingredients(crafting, quantities):
+    # 2 clusters held, 1 crafted from 5 cubes: 3 held, 2 crafted from 6 orirock, 4 of them held
+    plan = inventory.solve(quantities(Orirock_Cluster=3),
+                           quantities(Orirock_Cluster=2, Orirock_Cube=3, Orirock=4, LMD=250), crafting)
+    assert plan.to_dict(plan.crafts) == {'Orirock Cluster': 1, 'Orirock Cube': 2}
+    assert plan.lmd == 200 + 2 * 100
+    assert plan.to_dict(plan.shortage) == {'Orirock': 2, 'LMD': 150}
+    assert plan.to_dict(plan.used) == {'Orirock Cluster': 2, 'Orirock Cube': 3, 'Orirock': 4, 'LMD': 250}
+
+
+def test_rows_are_solved_against_their_own_inventory(crafting, quantities):
+    held = quantities(Orirock_Cube=5)
+    needed = np.stack([quantities(Orirock_Cube=3), quantities(Orirock_Cube=8)])
+    plan = inventory.solve(needed, held, crafting)
+    assert plan.shortage.shape == needed.shape
+    assert [plan.to_dict(row) for row in plan.shortage] == [{}, {'Orirock': 9, 'LMD': 300}]
+    assert plan.lmd.tolist() == [0, 300]
+    single = inventory.solve(needed[1], held, crafting)
+    assert (single.shortage == plan.shortage[1]).all()
+
+
+def test_load_inventory_resolves_aliases(crafting, tmp_path):
+    path = tmp_path / 'user_resources.csv'
+    path.write_text('Tactical Battle Record,12\nOrirock,3\nOrirock,2\nUnknown Thing,1\n', encoding='utf-8')
+    with pytest.warns(UserWarning, match='Unknown Thing'):
+        held = inventory.load_inventory(str(path), crafting.resources)
+    assert held[crafting.resources.index('Tactical Battle Record - Yellow Exp')] == 12
+    assert held[crafting.resources.index('Orirock')] == 5
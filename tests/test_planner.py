@@ -0,0 +1,81 @@
+# encoding: utf-8
+import numpy as np
+import pandas as pd
+import pytest
+
+from arknights import cli, explmd, planner, roster
+
+HEADER = 'name;stars;elite;level;skill_level;s1_mastery;s2_mastery;s3_mastery'
+
+
+def read(tmp_path, *lines, header=HEADER):
+    path = tmp_path / 'user_operators.csv'
+    path.write_text('\n'.join((header,) + lines) + '\n', encoding='utf-8')
+    return str(path), roster.read_roster(str(path)).roster
+
+
+def expected_cost(engine, name, current, target):
+    """Materials from ``current`` to ``target``, ``{column: value}`` states."""
+    operators = engine.indices([name])
+    states = [engine.state_matrix({'name': [name], **{column: [value] for column, value in state.items()}})
+              for state in (current, target)]
+    return engine.cost_between(operators, *states)[0]
+
+
+def test_plan_to_the_targets_of_the_roster(tmp_path, engine):
+    _, user_roster = read(tmp_path, 'Exusiai;6;1;50;4;0;0;0;2;1;7;3',
+                          header=HEADER + ';target_elite;target_level;target_skill_level;target_s2_mastery')
+    result = planner.plan(user_roster)
+    materials = expected_cost(engine, 'Exusiai', dict(elite=1, skill_level=4),
+                              dict(elite=2, skill_level=7, s2_mastery=3))
+    assert materials.any()
+    assert (result.materials[0] == materials).all()
+    table = explmd.get_table()
+    assert result.leveling_lmd[0] == table.lmd_between(6, 1, 50, 2, 1)
+    assert result.exp[0] == table.exp_between(6, 1, 50, 2, 1)
+
+
+def test_blank_targets_keep_the_current_state(tmp_path):
+    _, user_roster = read(tmp_path, 'Exusiai;6;1;50;4;0;0;0;;', 'Exusiai;6;1;50;4;0;0;0;;60',
+                          header=HEADER + ';target_elite;target_level')
+    targets = planner.with_targets(user_roster)
+    assert targets['target_elite'].tolist() == [1, 1]
+    assert targets['target_level'].tolist() == [50, 60]
+    assert targets['target_s3_mastery'].tolist() == [0, 0]
+    result = planner.plan(user_roster)
+    assert not result.materials.any()
+    assert result.leveling_lmd[0] == 0 and result.leveling_lmd[1] > 0
+
+
+def test_targets_below_the_current_state_cost_nothing(tmp_path):
+    _, user_roster = read(tmp_path, 'Exusiai;6;2;90;7;0;0;3;1;1;4;0',
+                          header=HEADER + ';target_elite;target_level;target_skill_level;target_s3_mastery')
+    result = planner.plan(user_roster)
+    assert not result.materials.any()
+    assert result.leveling_lmd.tolist() == [0] and result.exp.tolist() == [0]
+
+
+def test_sidecar_targets_replace_the_roster_ones(tmp_path):
+    _, user_roster = read(tmp_path, 'Exusiai;6;1;50;4;0;0;0;2', 'Fang;3;1;55;7;0;0;0;1',
+                          header=HEADER + ';target_elite')
+    sidecar = tmp_path / 'user_targets.csv'
+    sidecar.write_text('name;target_level;target_elite\nExusiai;1;1\nExusiai;80;1\n', encoding='utf-8')
+    with pytest.warns(UserWarning, match='more than once.*Exusiai'):
+        targets = planner.load_targets(str(sidecar))
+    merged = planner.with_targets(user_roster, targets)
+    assert merged.index.tolist() == user_roster.index.tolist()
+    assert merged[['target_elite', 'target_level']].values.tolist() == [[1, 80], [1, 55]]
+    with pytest.raises(ValueError):
+        planner.with_targets(user_roster, pd.concat([targets, targets]))
+
+
+def test_plan_report_cites_the_csv_line_of_bad_sidecar_targets(tmp_path):
+    path, _ = read(tmp_path, 'Exusiai;6;1;50;4;0;0;0', '', 'Nobody;6;0;1;1;0;0;0', 'Fang;3;1;55;7;0;0;0')
+    sidecar = tmp_path / 'user_targets.csv'
+    sidecar.write_text('name;target_level\nExusiai;60\nFang;90\n', encoding='utf-8')
+    data = cli.ReportData(operators_path=path, cache_path=None, targets_path=str(sidecar))
+    with pytest.warns(UserWarning) as warned:
+        table = cli.plan_table(data)
+    messages = [str(warning.message) for warning in warned]
+    assert any('line 5 (Fang): target level 90 beyond the elite 1 cap of 55' in message for message in messages)
+    assert table.index.get_level_values('operator').unique().tolist() == ['Exusiai']
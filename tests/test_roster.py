@@ -0,0 +1,95 @@
+# encoding: utf-8
+import pandas as pd
+import pytest
+
+from arknights import roster
+
+HEADER = 'name;stars;elite;level;skill_level;s1_mastery;s2_mastery;s3_mastery'
+
+
+def write_roster(tmp_path, *lines, header=HEADER):
+    path = tmp_path / 'user_operators.csv'
+    path.write_text('\n'.join((header,) + lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def messages(chunk):
+    return [(error.line, error.operator, error.message) for error in chunk.errors]
+
+
+def test_read_roster_reports_invalid_rows(tmp_path):
+    path = write_roster(
+        tmp_path,
+        'Exusiai;6;2;90;7;0;0;3',
+        'Nobody;6;2;90;7;0;0;3',
+        'Exusiai;6;3;1;7;0;0;0',
+        'Exusiai;6;1;81;7;0;0;0',
+        'Exusiai;6;2;90;8;0;0;0',
+        'Fang;3;1;55;7;1;0;0',
+        'Exusiai;6;two;1;1;0;0;0',
+        'Exusiai;6;2;90;7;0;0;3;extra;fields',
+        '',
+        'Fang;3;1;55',
+    )
+    chunk = roster.read_roster(path)
+    assert messages(chunk) == [
+        (3, 'Nobody', 'unknown operator'),
+        (4, 'Exusiai', 'elite 3 beyond the 6-star cap of 2'),
+        (5, 'Exusiai', 'level 81 beyond the elite 1 cap of 80'),
+        (6, 'Exusiai', 'skill level 8 outside 0 to 7'),
+        (7, 'Fang', 's1_mastery on a 3-star operator'),
+        (8, 'Exusiai', "elite is not an integer: 'two'"),
+        (9, 'Exusiai', '10 fields, the header has 8'),
+    ]
+    assert chunk.roster['name'].tolist() == ['Exusiai', 'Fang']
+    # Missing trailing fields and columns take the defaults
+    assert chunk.roster.iloc[1][list(roster.ROSTER_DEFAULTS)].tolist() == [55, 1, 1, 0, 0, 0, 0, 0]
+
+
+def test_iter_roster_bounds_the_chunks(tmp_path):
+    path = write_roster(tmp_path, *['Exusiai;6;2;90;7;0;0;3'] * 4, 'Nobody;6;0;1;1;0;0;0')
+    chunks = list(roster.iter_roster(path, chunk_rows=2))
+    assert [len(chunk.roster) for chunk in chunks] == [2, 2, 0]
+    assert messages(chunks[-1]) == [(6, 'Nobody', 'unknown operator')]
+    assert [chunk.roster.index.tolist() for chunk in chunks[:2]] == [[2, 3], [4, 5]]
+
+
+@pytest.mark.parametrize('content', ['', HEADER + '\n'])
+def test_read_roster_without_rows(tmp_path, content):
+    path = tmp_path / 'user_operators.csv'
+    path.write_text(content, encoding='utf-8')
+    chunk = roster.read_roster(str(path))
+    assert chunk.errors == []
+    assert chunk.roster.empty
+    assert list(chunk.roster.columns) == ['name'] + list(roster.ROSTER_DEFAULTS)
+    assert roster.build_frame(chunk.roster).info.empty
+
+
+def test_validate_roster_checks_targets(tmp_path):
+    path = write_roster(
+        tmp_path,
+        'Exusiai;6;1;50;4;0;0;0;2;;;',
+        'Exusiai;6;1;50;4;0;0;0;3;;;',
+        'Exusiai;6;1;50;4;0;0;0;;;x;',
+        'Fang;3;1;55;4;0;0;0;;;;1',
+        header=HEADER + ';target_elite;target_level;target_skill_level;target_s3_mastery',
+    )
+    chunk = roster.read_roster(path)
+    assert messages(chunk) == [
+        (3, 'Exusiai', 'target elite 3 beyond the 6-star cap of 2'),
+        (4, 'Exusiai', "target_skill_level is not an integer: 'x'"),
+        (5, 'Fang', 'target s3_mastery on a 3-star operator'),
+    ]
+    assert chunk.roster['target_elite'].dtype == 'Int64'
+    states = roster.target_states(chunk.roster)
+    assert [states[column][0] for column in ('elite', 'level', 'skill_level', 's3_mastery')] == [2, 50, 4, 0]
+
+
+def test_validate_targets_after_merge():
+    user_roster = pd.DataFrame({'name': ['Exusiai', 'Fang'], **{column: [1, 1] for column in roster.ROSTER_DEFAULTS},
+                                'target_level': pd.array([90, 90], dtype='Int64'),
+                                'target_elite': pd.array([2, pd.NA], dtype='Int64')}, index=[2, 3])
+    user_roster.loc[:, 'level'] = 30
+    chunk = roster.validate_targets(user_roster)
+    assert messages(chunk) == [(3, 'Fang', 'target level 90 beyond the elite 1 cap of 55')]
+    assert chunk.roster.index.tolist() == [2]
@@ -0,0 +1,159 @@
+# encoding: utf-8
+import asyncio
+import json
+
+import pytest
+
+from arknights import explmd, service
+from arknights.operator import Operator
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return service.Calculator()
+
+
+def post(calculator, path, query):
+    return calculator.answer('POST', path, json.dumps(query).encode('utf-8'))
+
+
+def step_costs(calculator, name, current, target, track):
+    """Engine resources from ``current`` to ``target`` on one track, ``{column: value}`` states."""
+    engine = calculator.engine
+    operators = engine.indices([name])
+    states = [engine.state_matrix({'name': [name], **{column: [value] for column, value in state.items()}})
+              for state in (current, target)]
+    costs = engine.cost_between(operators, *states, track=track)
+    return engine.evaluate_states(operators, states[0]).to_dicts(costs)[0]
+
+
+def test_missing_target_means_fully_upgraded(calculator):
+    status, result = post(calculator, '/operator', {'name': 'Exusiai', 'elite': 1, 'level': 40, 'skill_level': 4})
+    operator = Operator(name='Exusiai', elite_level=1, level=40, skill_level=4)
+    assert status == 200
+    assert result['needed_resources'] == operator.needed_resources
+    assert result['spent_resources'] == operator.spent_resources
+    assert result['needed_lmd'] == operator.needed_lmd
+
+
+def test_target_fields_left_out_keep_the_current_value(calculator):
+    current = {'name': 'Exusiai', 'elite': 2, 'level': 1, 'skill_level': 4}
+    status, result = post(calculator, '/operator', dict(current, target={'skill_level': 7}))
+    assert status == 200
+    assert result['needed_resources'] == step_costs(calculator, 'Exusiai', {'elite': 2, 'skill_level': 4},
+                                                    {'elite': 2, 'skill_level': 7}, 'skill')
+    assert result['needed_lmd'] == 0 and result['needed_yellow_exp'] == 0
+
+
+def test_targets_are_clamped_per_track(calculator):
+    # Elite and S3 targets below the current state cost nothing and must not offset the S1 mastery cost
+    current = {'name': 'Exusiai', 'elite': 2, 'level': 50, 'skill_level': 7, 's3_mastery': 3}
+    target = {'elite': 1, 'level': 1, 's1_mastery': 3, 's3_mastery': 0}
+    status, result = post(calculator, '/operator', dict(current, target=target))
+    assert status == 200
+    expected = step_costs(calculator, 'Exusiai', {'elite': 2, 'skill_level': 7},
+                          {'elite': 2, 'skill_level': 7, 's1_mastery': 3}, 'mastery')
+    assert expected and result['needed_resources'] == expected
+    assert result['needed_lmd'] == 0 and result['needed_yellow_exp'] == 0
+
+
+def test_roster_sums_leveling_into_the_resources(calculator):
+    operators = [{'name': 'Exusiai', 'elite': 2, 'level': 1, 'skill_level': 7, 'target': {'level': 90}},
+                 {'name': 'Exusiai', 'elite': 2, 'level': 90, 'skill_level': 7, 'target': {}}]
+    status, result = post(calculator, '/roster', {'operators': operators})
+    assert status == 200 and result['operators'] == 2
+    assert result['resources']['LMD']['needed'] == explmd.get_table().lmd_between(6, 2, 1, 2, 90)
+
+
+@pytest.mark.parametrize('path, query, message', [
+    ('/operator', {'name': 'Nobody'}, 'Unknown operator'),
+    ('/operator', {'name': 'Exusiai', 'elite': 'two'}, 'Invalid operator state'),
+    ('/operator', {'name': 'Exusiai', 'target': {'elite': [2]}}, 'Invalid operator state'),
+    ('/operators', {'operators': {'name': 'Exusiai'}}, 'must be a list'),
+    ('/shortage', {'operators': [], 'inventory': [1]}, "'inventory' must be an object"),
+    ('/shortage', {'operators': [], 'inventory': {'Orirock': 'many'}}, 'Invalid quantity of Orirock'),
+    ('/roster', [1, 2], 'must be a JSON object'),
+])
+def test_bad_queries_are_answered_400(calculator, path, query, message):
+    status, result = post(calculator, path, query)
+    assert status == 400
+    assert message in result['error']
+
+
+def test_invalid_json_is_answered_400(calculator):
+    status, result = calculator.answer('POST', '/roster', b'{"operators": ')
+    assert status == 400 and result['error'].startswith('Invalid JSON')
+
+
+def test_routes(calculator):
+    assert calculator.answer('GET', '/health', b'')[0] == 200
+    assert calculator.answer('POST', '/nowhere', b'{}')[0] == 404
+    assert calculator.answer('GET', '/operator', b'')[0] == 405
+
+
+def test_shortage_nets_the_inventory(calculator):
+    operators = [{'name': 'Exusiai', 'elite': 2, 'level': 90, 'skill_level': 7, 's3_mastery': 2}]
+    _, needed = post(calculator, '/roster', {'operators': operators})
+    status, result = post(calculator, '/shortage', {'operators': operators,
+                                                    'inventory': {'LMD': 1, 'Unknown Thing': 3}})
+    assert status == 200
+    assert result['unknown_resources'] == ['Unknown Thing']
+    assert result['resources']['LMD']['used'] == 1
+    assert {name: quantities['needed'] for name, quantities in result['resources'].items() if quantities['needed']} \
+        == {name: quantities['needed'] for name, quantities in needed['resources'].items() if quantities['needed']}
+
+
+async def exchange(port, requests):
+    """Raw ``requests`` written on one connection, the (status, headers, payload) responses read back."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    for request in requests:
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            break
+        headers = dict()
+        while (line := await reader.readline()) not in (b'\r\n', b''):
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers['content-length']))
+        responses.append((int(status_line.split()[1]), headers, json.loads(body)))
+    closed = await reader.read() == b''
+    writer.close()
+    return responses, closed
+
+
+def request(method, path, body=b'', headers=''):
+    return (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n{headers}\r\n"
+            .encode('latin-1') + body)
+
+
+def run_server(calculator, requests):
+    async def main():
+        server = await asyncio.start_server(service.QueryServer(calculator).handle, '127.0.0.1', 0)
+        async with server:
+            return await exchange(server.sockets[0].getsockname()[1], requests)
+    return asyncio.run(main())
+
+
+def test_server_keeps_connections_alive(calculator):
+    body = json.dumps({'name': 'Exusiai'}).encode('utf-8')
+    responses, closed = run_server(calculator, [
+        request('GET', '/health'),
+        request('POST', '/operator', body),
+        request('POST', '/operator?pretty=1', b'[]', headers='Connection: close\r\n'),
+    ])
+    assert [status for status, _, _ in responses] == [200, 200, 400]
+    assert [headers['connection'] for _, headers, _ in responses] == ['keep-alive', 'keep-alive', 'close']
+    assert responses[1][2]['name'] == 'Exusiai'
+    assert closed
+
+
+def test_server_refuses_oversized_bodies(calculator):
+    oversized = (f"POST /roster HTTP/1.1\r\nContent-Length: {service.MAX_BODY_SIZE + 1}\r\n\r\n"
+                 .encode('latin-1'))
+    responses, closed = run_server(calculator, [oversized, request('GET', '/health')])
+    assert [(status, headers['connection']) for status, headers, _ in responses] == [(413, 'close')]
+    assert closed
+